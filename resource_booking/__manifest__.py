@@ -5,7 +5,7 @@
 {
     "name": "Resource booking",
     "summary": "Manage appointments and resource booking",
-    "version": "14.0.1.3.4",
+    "version": "14.0.1.5.0",
     "development_status": "Production/Stable",
     "category": "Appointments",
     "website": "https://github.com/OCA/calendar",
@@ -28,6 +28,7 @@
         "web_calendar_slot_duration",
     ],
     "data": [
+        "data/ir_cron.xml",
         "data/mail.xml",
         "security/resource_booking_security.xml",
         "security/ir.model.access.csv",
@@ -37,7 +38,9 @@
         "views/resource_booking_combination_views.xml",
         "views/resource_booking_type_views.xml",
         "views/resource_booking_views.xml",
+        "views/resource_booking_metric_views.xml",
         "views/menus.xml",
     ],
     "demo": ["demo/res_users_demo.xml"],
+    "post_init_hook": "post_init_hook",
 }
@@ -2,17 +2,29 @@
 # Copyright 2022 Tecnativa - Pedro M. Baeza
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
-from datetime import datetime
+from datetime import datetime, timedelta
+from time import time
 from urllib.parse import quote_plus
 
 from dateutil.parser import isoparse
+from pytz import utc
 
+from odoo import _, fields
 from odoo.exceptions import AccessError, MissingError, ValidationError
 from odoo.http import request, route
-from odoo.tests.common import Form
 
 from odoo.addons.portal.controllers import portal
 
+# Avoid computing slots for arbitrarily long periods in a single request
+MAX_SLOTS_RANGE_DAYS = 42
+# Maximum next available slots that can be requested at once
+MAX_NEXT_SLOTS = 50
+# Seconds to reuse the bookings count stored in the session
+BOOKING_COUNT_TTL = 60
+# Order of the bookings list, which must be unique to seek pages by a booking
+BOOKINGS_ORDER = "start DESC, id DESC"
+BOOKINGS_REVERSE_ORDER = "start, id"
+
 
 class CustomerPortal(portal.CustomerPortal):
     def _get_booking_sudo(self, booking_id, access_token):
@@ -27,10 +39,68 @@ class CustomerPortal(portal.CustomerPortal):
     def _prepare_portal_layout_values(self):
         """Compute values for multi-booking portal views."""
         values = super(CustomerPortal, self)._prepare_portal_layout_values()
-        booking_count = request.env["resource.booking"].search_count([])
-        values.update({"booking_count": booking_count})
+        values.update({"booking_count": self._get_booking_count()})
         return values
 
+    def _get_booking_count(self):
+        """Count bookings I can access, reusing a recent count if possible."""
+        cached = request.session.get("my_bookings_count")
+        now = time()
+        if (
+            cached
+            and cached["uid"] == request.env.uid
+            and now - cached["time"] < BOOKING_COUNT_TTL
+        ):
+            return cached["count"]
+        count = request.env["resource.booking"].search_count([])
+        request.session["my_bookings_count"] = {
+            "uid": request.env.uid,
+            "time": now,
+            "count": count,
+        }
+        return count
+
+    def _get_bookings_seek_domain(self, cursor, previous=False):
+        """Domain of bookings listed after (or before) the cursor booking.
+
+        Bookings are listed by `BOOKINGS_ORDER`, where PostgreSQL puts
+        unscheduled bookings (without start) first.
+        """
+        if previous:
+            if not cursor.start:
+                return [("start", "=", False), ("id", ">", cursor.id)]
+            return [
+                "|",
+                "|",
+                ("start", "=", False),
+                ("start", ">", cursor.start),
+                "&",
+                ("start", "=", cursor.start),
+                ("id", ">", cursor.id),
+            ]
+        if not cursor.start:
+            return [
+                "|",
+                ("start", "!=", False),
+                "&",
+                ("start", "=", False),
+                ("id", "<", cursor.id),
+            ]
+        return [
+            "|",
+            ("start", "<", cursor.start),
+            "&",
+            ("start", "=", cursor.start),
+            ("id", "<", cursor.id),
+        ]
+
+    def _prefetch_portal_bookings(self, bookings):
+        """Load in batch everything the bookings list renders."""
+        bookings.mapped("display_name")
+        bookings.mapped("access_url")
+        bookings.mapped("type_id.display_name")
+        bookings.mapped("combination_id.display_name")
+
     def _booking_get_page_view_values(self, booking_sudo, access_token, **kwargs):
         """Compute values for single-booking portal views."""
         return self._get_page_view_values(
@@ -42,27 +112,50 @@ class CustomerPortal(portal.CustomerPortal):
             **kwargs
         )
 
-    @route(
-        ["/my/bookings", "/my/bookings/page/<int:page>"],
-        auth="user",
-        type="http",
-        website=True,
-    )
-    def portal_my_bookings(self, page=1, **kwargs):
-        """List bookings that I can access."""
+    @route(["/my/bookings"], auth="user", type="http", website=True)
+    def portal_my_bookings(self, after=None, before=None, **kwargs):
+        """List bookings that I can access.
+
+        Pages are sought from the last booking of the previous page (`after`)
+        or the first booking of the next one (`before`), so deep pages don't
+        become slower as offsets would.
+        """
         Booking = request.env["resource.booking"].with_context(using_portal=True)
         values = self._prepare_portal_layout_values()
-        pager = portal.pager(
-            url="/my/bookings",
-            total=values["booking_count"],
-            page=page,
-            step=self._items_per_page,
-        )
-        bookings = Booking.search(
-            [], limit=self._items_per_page, offset=pager["offset"]
-        )
+        step = self._items_per_page
+        previous = bool(before and not after)
+        cursor = Booking.browse()
+        try:
+            cursor_id = int(before if previous else after or 0)
+        except ValueError:
+            cursor_id = 0
+        if cursor_id:
+            cursor = Booking.search([("id", "=", cursor_id)])
+        domain = cursor and self._get_bookings_seek_domain(cursor, previous) or []
+        if previous:
+            bookings = Booking.search(
+                domain, limit=step + 1, order=BOOKINGS_REVERSE_ORDER
+            )
+            has_previous, has_next = len(bookings) > step, True
+            bookings = bookings[:step][::-1]
+        else:
+            bookings = Booking.search(domain, limit=step + 1, order=BOOKINGS_ORDER)
+            has_previous, has_next = bool(cursor), len(bookings) > step
+            bookings = bookings[:step]
+        self._prefetch_portal_bookings(bookings)
         request.session["my_bookings_history"] = bookings.ids
-        values.update({"bookings": bookings, "pager": pager, "page_name": "bookings"})
+        values.update(
+            {
+                "bookings": bookings,
+                "bookings_previous_url": has_previous
+                and bookings
+                and "/my/bookings?before=%d" % bookings[0].id,
+                "bookings_next_url": has_next
+                and bookings
+                and "/my/bookings?after=%d" % bookings[-1].id,
+                "page_name": "bookings",
+            }
+        )
         return request.render("resource_booking.portal_my_bookings", values)
 
     @route(["/my/bookings/<int:booking_id>"], type="http", auth="public", website=True)
@@ -106,6 +199,72 @@ class CustomerPortal(portal.CustomerPortal):
             "resource_booking.resource_booking_portal_schedule", values
         )
 
+    @route(
+        ["/my/bookings/<int:booking_id>/schedule/slots"],
+        auth="public",
+        type="json",
+        website=True,
+    )
+    def portal_booking_schedule_slots(
+        self, booking_id, start, end, access_token=None, **kwargs
+    ):
+        """Available slots for the booking between 2 dates, in JSON.
+
+        Lets the scheduling page load slots on demand, i.e. week by week.
+        """
+        booking_sudo = self._get_booking_sudo(booking_id, access_token)
+        try:
+            start, end = (fields.Date.to_date(day) for day in (start, end))
+        except (TypeError, ValueError):
+            raise ValidationError(_("Invalid dates to request slots."))
+        if not (start and end) or not (
+            start < end <= start + timedelta(days=MAX_SLOTS_RANGE_DAYS)
+        ):
+            raise ValidationError(
+                _("Slots can be requested for up to %d days.") % MAX_SLOTS_RANGE_DAYS
+            )
+        tz = booking_sudo.env["resource.calendar"]._get_context_timezone(strict=True)
+        return {
+            "slots": booking_sudo._get_available_slots_compact(start, end),
+            "tz": tz.zone,
+        }
+
+    @route(
+        ["/my/bookings/<int:booking_id>/schedule/next"],
+        auth="public",
+        type="json",
+        website=True,
+    )
+    def portal_booking_schedule_next(
+        self, booking_id, start=None, count=1, access_token=None, **kwargs
+    ):
+        """First available slots for the booking, in JSON.
+
+        Lets the scheduling page jump to the next availability, no matter how
+        far it is.
+        """
+        booking_sudo = self._get_booking_sudo(booking_id, access_token)
+        try:
+            count = int(count)
+        except (TypeError, ValueError):
+            count = 0
+        if not 0 < count <= MAX_NEXT_SLOTS:
+            raise ValidationError(
+                _("Up to %d next slots can be requested.") % MAX_NEXT_SLOTS
+            )
+        try:
+            start_dt = isoparse(start) if start else fields.Datetime.now()
+        except (TypeError, ValueError):
+            raise ValidationError(_("Invalid date to request next slots."))
+        if not start_dt.tzinfo:
+            start_dt = utc.localize(start_dt)
+        tz = booking_sudo.env["resource.calendar"]._get_context_timezone(strict=True)
+        slots = booking_sudo._get_next_available_slots(start_dt, count)
+        return {
+            "slots": [slot.timestamp() for slot in slots],
+            "tz": tz.zone,
+        }
+
     @route(
         ["/my/bookings/<int:booking_id>/cancel"],
         auth="public",
@@ -116,6 +275,7 @@ class CustomerPortal(portal.CustomerPortal):
         """Cancel the booking."""
         booking_sudo = self._get_booking_sudo(booking_id, access_token)
         booking_sudo.action_cancel()
+        request.session.pop("my_bookings_count", None)
         return request.redirect("/my")
 
     @route(
@@ -127,11 +287,12 @@ class CustomerPortal(portal.CustomerPortal):
     def portal_booking_confirm(self, booking_id, access_token, when, **kwargs):
         """Confirm a booking in a given datetime."""
         booking_sudo = self._get_booking_sudo(booking_id, access_token)
-        when_tz_aware = isoparse(when)
+        # The browser sends slots it loads on demand in UTC
+        tz = booking_sudo.env["resource.calendar"]._get_context_timezone()
+        when_tz_aware = isoparse(when).astimezone(tz)
         when_naive = datetime.utcfromtimestamp(when_tz_aware.timestamp())
         try:
-            with Form(booking_sudo) as booking_form:
-                booking_form.start = when_naive
+            booking_sudo._schedule(when_naive)
         except ValidationError as error:
             url = booking_sudo.get_portal_url(
                 suffix="/schedule/{:%Y/%m}".format(when_tz_aware),
@@ -0,0 +1,11 @@
+# Copyright 2026 Tecnativa
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import SUPERUSER_ID, api
+
+
+def post_init_hook(cr, registry):
+    """Materialize busy intervals and booked resources of existing meetings."""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env["resource.busy.interval"]._rebuild()
+    env["resource.booking.line"]._rebuild()
@@ -0,0 +1,116 @@
+# Copyright 2026 Tecnativa
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+"""Lightweight metrics for booking availability hot paths.
+
+Metrics live in memory and are aggregated per worker process, so each worker
+reports only what it computed itself. Nested measured calls are included in
+the figures of their callers too.
+
+They are only collected when the ``resource_booking_metrics`` option is
+enabled in the server configuration file, or after calling `set_enabled()`.
+"""
+
+import logging
+import threading
+from collections import defaultdict
+from functools import wraps
+from time import perf_counter
+
+from odoo.tools import config
+
+_logger = logging.getLogger(__name__)
+_enabled = bool(config.get("resource_booking_metrics"))
+_lock = threading.Lock()
+_metrics = defaultdict(lambda: {"calls": 0, "items": 0, "queries": 0, "seconds": 0.0})
+
+
+def _count_result(records, result):
+    return len(result)
+
+
+def _record(name, records, result, failed, queries, elapsed, subject, items):
+    """Aggregate the figures of one measured call."""
+    try:
+        key = (name, subject(records) if subject else "")
+    except Exception:
+        # A failed call may leave the cursor unusable for the subject
+        key = (name, "")
+    try:
+        processed = items(records, result) if items and not failed else 0
+    except Exception:
+        processed = 0
+    with _lock:
+        entry = _metrics[key]
+        entry["calls"] += 1
+        entry["items"] += processed
+        entry["queries"] += queries
+        entry["seconds"] += elapsed
+
+
+def measured(subject=None, items=_count_result):
+    """Record calls, wall time, SQL queries and processed items of a method.
+
+    :param subject:
+        Function that receives the recordset and returns a string to aggregate
+        metrics by, such as the booking type or the combination.
+    :param items:
+        Function that receives the recordset and the method result, and
+        returns how many items (events, intervals, slots...) were processed.
+
+    Both functions run after taking the call figures, so their own queries
+    aren't counted, and only when metrics are enabled. Calls that raise are
+    counted too, without items. Collecting metrics never alters the result
+    or the exception of the measured method.
+    """
+
+    def decorator(method):
+        name = method.__qualname__
+
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if not _enabled:
+                return method(self, *args, **kwargs)
+            queries = self.env.cr.sql_log_count
+            start = perf_counter()
+            result, failed = None, True
+            try:
+                result = method(self, *args, **kwargs)
+                failed = False
+                return result
+            finally:
+                try:
+                    # Take counters before running the callbacks, which may query
+                    elapsed = perf_counter() - start
+                    queries = self.env.cr.sql_log_count - queries
+                    _record(
+                        name, self, result, failed, queries, elapsed, subject, items
+                    )
+                except Exception:
+                    _logger.debug("Cannot record metrics of %s", name, exc_info=True)
+
+        return wrapper
+
+    return decorator
+
+
+def is_enabled():
+    """Know if metrics are being collected in this worker."""
+    return _enabled
+
+
+def set_enabled(enabled):
+    """Start or stop collecting metrics in this worker."""
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def snapshot():
+    """Get a copy of current metrics, indexed by `(method, subject)`."""
+    with _lock:
+        return {key: dict(value) for key, value in _metrics.items()}
+
+
+def reset():
+    """Forget all metrics of this worker."""
+    with _lock:
+        _metrics.clear()
@@ -0,0 +1,10 @@
+# Copyright 2026 Tecnativa
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import SUPERUSER_ID, api
+
+
+def migrate(cr, version):
+    """Materialize busy intervals for existing meetings."""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env["resource.busy.interval"]._rebuild()
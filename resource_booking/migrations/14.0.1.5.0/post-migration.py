@@ -0,0 +1,10 @@
+# Copyright 2026 Tecnativa
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import SUPERUSER_ID, api
+
+
+def migrate(cr, version):
+    """Track resources booked by bookings that didn't end yet."""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env["resource.booking.line"]._rebuild()
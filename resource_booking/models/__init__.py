@@ -1,7 +1,19 @@
+from . import calendar_attendee
 from . import calendar_event
+from . import ir_http
+from . import res_users
 from . import resource_booking
+from . import resource_booking_cache_version
 from . import resource_booking_combination
+from . import resource_booking_combination_load
+from . import resource_booking_line
+from . import resource_booking_metric
+from . import resource_booking_notification
+from . import resource_booking_slot_cache
 from . import resource_booking_type
 from . import resource_booking_type_combination_rel
+from . import resource_busy_interval
 from . import resource_calendar
+from . import resource_calendar_attendance
+from . import resource_calendar_leaves
 from . import resource_resource
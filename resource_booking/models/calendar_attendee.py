@@ -0,0 +1,22 @@
+# Copyright 2026 Tecnativa
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import models
+
+
+class CalendarAttendee(models.Model):
+    _inherit = "calendar.attendee"
+
+    def write(self, vals):
+        """Resources are not busy when declining invitations."""
+        result = super().write(vals)
+        if {"partner_id", "state"}.intersection(vals):
+            self.mapped("event_id")._refresh_busy_intervals()
+        return result
+
+    def unlink(self):
+        """Uninvited resources are not busy anymore."""
+        events = self.mapped("event_id")
+        result = super().unlink()
+        events._refresh_busy_intervals()
+        return result
@@ -5,6 +5,22 @@
 from odoo import _, api, fields, models
 from odoo.exceptions import ValidationError
 
+# Fields that can alter the time when resources are busy because of a meeting
+BUSY_FIELDS = {
+    "active",
+    "allday",
+    "attendee_ids",
+    "duration",
+    "partner_ids",
+    "resource_booking_ids",
+    "show_as",
+    "start",
+    "start_date",
+    "stop",
+    "stop_date",
+    "user_id",
+}
+
 
 class CalendarEvent(models.Model):
     _inherit = "calendar.event"
@@ -39,7 +55,15 @@ class CalendarEvent(models.Model):
     def unlink(self):
         """Check you're allowed to unschedule it."""
         self._validate_booking_modifications()
-        return super().unlink()
+        resources = (
+            self.env["resource.busy.interval"]
+            .sudo()
+            .search([("event_id", "in", self.ids)])
+            .mapped("resource_id")
+        )
+        result = super().unlink()
+        self.env["resource.booking.slot.cache"]._invalidate(resources=resources)
+        return result
 
     def write(self, vals):
         """Check you're allowed to reschedule it."""
@@ -50,32 +74,113 @@ class CalendarEvent(models.Model):
             if old_start == new.start and old_stop == new.stop:
                 rescheduled -= new
         rescheduled._validate_booking_modifications()
+        if BUSY_FIELDS.intersection(vals):
+            self._refresh_busy_intervals()
         return result
 
     @api.model_create_multi
     def create(self, vals_list):
-        """Transfer resource booking to _attendees_values by context.
+        """Create booking meetings in batch, and autoconfirm their attendees.
 
-        We need to serialize the creation in that case.
         mail_notify_author key from context is necessary to force the notification
         to be sent to author.
         """
-        vals_list2 = []
+        booking_vals_list = [
+            vals for vals in vals_list if "resource_booking_ids" in vals
+        ]
+        other_vals_list = [
+            vals for vals in vals_list if "resource_booking_ids" not in vals
+        ]
         records = self.env["calendar.event"]
-        for vals in vals_list:
-            if "resource_booking_ids" in vals:
-                records += super(
-                    CalendarEvent,
-                    self.with_context(
-                        resource_booking_ids=vals["resource_booking_ids"],
-                        mail_notify_author=True,
-                    ),
-                ).create(vals)
-            else:
-                vals_list2.append(vals)
-        records += super().create(vals_list2)
+        if booking_vals_list:
+            booking_records = super(
+                CalendarEvent, self.with_context(mail_notify_author=True)
+            ).create(booking_vals_list)
+            booking_records._autoconfirm_booking_attendees(booking_vals_list)
+            records += booking_records
+        if other_vals_list:
+            records += super().create(other_vals_list)
+        records._refresh_busy_intervals()
         return records
 
+    def _prepare_booking_notifications(self, template, new_partner_ids=()):
+        """Values for deferred mails to attendees of these booking meetings.
+
+        :param str template:
+            XML ID of the template to notify all attendees, if any.
+        :param list new_partner_ids:
+            Partners newly invited, who need an invitation anyway.
+        """
+        result = []
+        for meeting in self:
+            booking = meeting.resource_booking_ids[:1]
+            if not booking:
+                continue
+            if template:
+                result.append(
+                    {
+                        "booking_id": booking.id,
+                        "kind": "attendees",
+                        "meeting_id": meeting.id,
+                        "template": template,
+                    }
+                )
+            if new_partner_ids:
+                result.append(
+                    {
+                        "booking_id": booking.id,
+                        "kind": "attendees",
+                        "meeting_id": meeting.id,
+                        "partner_ids": [(6, 0, list(new_partner_ids))],
+                        "template": "calendar.calendar_template_meeting_invitation",
+                    }
+                )
+        return result
+
+    def _autoconfirm_booking_attendees(self, vals_list):
+        """Accept attendance of preselected partners of new booking meetings.
+
+        Same as `_attendees_values()`, but for a batch of meetings created
+        with the given values, in the same order.
+        """
+        to_accept = self.env["calendar.attendee"]
+        for meeting, vals in zip(self, vals_list):
+            partner_ids = meeting._get_autoconfirmed_partner_ids(
+                vals["resource_booking_ids"]
+            )
+            to_accept |= meeting.attendee_ids.filtered(
+                lambda attendee: attendee.partner_id.id in partner_ids
+            )
+        if to_accept:
+            to_accept.write({"state": "accepted"})
+
+    def _get_autoconfirmed_partner_ids(self, booking_commands):
+        """Partners whose attendance is confirmed when (re)creating attendees.
+
+        :param list booking_commands: `resource_booking_ids` commands.
+        """
+        partner_ids = False
+        for cmd in booking_commands:
+            if cmd[0] == 0 and not cmd[2].get("combination_auto_assign", True):
+                partner_ids = [cmd[2]["partner_id"]]
+            elif cmd[0] == 6:
+                rb = self.env["resource.booking"].browse(cmd[2])
+                if rb.combination_auto_assign:
+                    continue  # only auto-confirm if handpicked combination
+                partner_ids = rb.combination_id.resource_ids.user_id.partner_id.ids
+        return partner_ids or []
+
+    def _refresh_busy_intervals(self):
+        """Update materialized busy intervals of resources.
+
+        Meetings altered together could not see each other while being
+        validated, so those whose intervals changed are validated again.
+        """
+        changed = self.env["resource.busy.interval"]._refresh(self)
+        if len(self) > 1:
+            changed.with_env(self.env)._check_bookings_scheduling()
+        return changed
+
     def get_interval(self, interval, tz=None):
         """Autofix tz from related resource booking.
 
@@ -94,21 +199,12 @@ class CalendarEvent(models.Model):
         not a real case for now.
         """
         attendee_commands = super()._attendees_values(partner_commands)
-        partner_ids = False
-        for cmd in self.env.context.get("resource_booking_ids", []):
-            if cmd[0] == 0 and not cmd[2].get("combination_auto_assign", True):
-                partner_ids = [cmd[2]["partner_id"]]
-            elif cmd[0] == 6:
-                rb = self.env["resource.booking"].browse(cmd[2])
-                if rb.combination_auto_assign:
-                    continue  # only auto-confirm if handpicked combination
-                partner_ids = rb.combination_id.resource_ids.user_id.partner_id.ids
+        # New meetings are handled in `_autoconfirm_booking_attendees()`
+        rb = self.sudo().resource_booking_ids
+        partner_ids = rb.combination_id.resource_ids.user_id.partner_id.ids
         for command in attendee_commands:
             if command[0] != 0:
                 continue
-            if not partner_ids:
-                rb = self.sudo().resource_booking_ids
-                partner_ids = rb.combination_id.resource_ids.user_id.partner_id.ids
             if command[2]["partner_id"] in partner_ids:
                 command[2]["state"] = "accepted"
         return attendee_commands
@@ -0,0 +1,13 @@
+# Copyright 2026 Tecnativa
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import models
+
+
+class IrHttp(models.AbstractModel):
+    _inherit = "ir.http"
+
+    @classmethod
+    def _get_translation_frontend_modules_name(cls):
+        """Translate the scheduling templates rendered by the browser."""
+        return super()._get_translation_frontend_modules_name() + ["resource_booking"]
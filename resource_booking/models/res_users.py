@@ -0,0 +1,21 @@
+# Copyright 2026 Tecnativa
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import models
+
+
+class ResUsers(models.Model):
+    _inherit = "res.users"
+
+    def write(self, vals):
+        """Archived users are not busy with their meetings."""
+        result = super().write(vals)
+        if "active" in vals:
+            partners = self.with_context(active_test=False).mapped("partner_id")
+            events = (
+                self.env["calendar.event"]
+                .with_context(active_test=False)
+                .search([("partner_ids", "in", partners.ids)])
+            )
+            events._refresh_busy_intervals()
+        return result
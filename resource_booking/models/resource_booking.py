@@ -3,19 +3,28 @@
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
 import calendar
-from datetime import datetime, timedelta
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime, time, timedelta
 
 from dateutil.relativedelta import relativedelta
 
 from odoo import _, api, fields, models
 from odoo.exceptions import ValidationError
+from odoo.osv import expression
+from odoo.tools import split_every
 
-from odoo.addons.resource.models.resource import Intervals
+from ..metrics import measured
 
+# Days covered by the first window when searching the next available slots;
+# each following window doubles the previous one
+NEXT_SLOTS_FIRST_WINDOW_DAYS = 7
+# Never search next available slots further than these days
+NEXT_SLOTS_MAX_DAYS = 366
 
-def _availability_is_fitting(available_intervals, start_dt, end_dt):
-    # Test whether the stretch between start_dt and end_dt is an uninterrupted
-    # stretch of time as determined by `available_intervals`.
+
+def _normalize_intervals(available_intervals):
+    # Merge `available_intervals` into maximal uninterrupted stretches of time.
     #
     # `available_intervals` is typically created by `_get_intervals()`, which in
     # turn uses `calendar._work_intervals()`. It appears to be default upstream
@@ -28,47 +37,52 @@ def _availability_is_fitting(available_intervals, start_dt, end_dt):
     # probably be preferable, but (1.) the code in `_work_intervals()` is
     # unbelievably arcane, and (2.) changing this behaviour is extremely likely
     # to cause bugs elsewhere. So instead, we account for the upstream behaviour
-    # here.
-    start_date = start_dt.date()
-    end_date = end_dt.date()
-    # Booking is uninterrupted on the same calendar day.
-    if (
-        len(available_intervals) == 1
-        and available_intervals._items[0][0] <= start_dt
-        and available_intervals._items[0][1] >= end_dt
-    ):
-        return True
-    # Booking spans more than one calendar day, e.g. from 23:00 to 1:00
-    # the next day.
-    elif available_intervals and start_date != end_date:
-        tally_date = start_date
-        for item in available_intervals:
-            item0_date = item[0].date()
-            item1_date = item[1].date()
-            # FIXME: Really weird workaround for when available_intervals has
-            # nonsensical items in it where item1_date is before item0_date.
-            # Just ignore those items and pretend they don't exist; all the
-            # other items appear to make sense.
-            if item1_date < item0_date:
+    # here, once, and the result can be queried many times with
+    # `_normalized_is_fitting()`.
+    #
+    # Returns a sorted list of (start_dt, end_dt) tuples.
+    result = []
+    for start, end, _meta in available_intervals:
+        if result:
+            last_start, last_end = result[-1]
+            # An interval that ends at 23:59 (and any number of seconds) is
+            # continued by the next one if it starts at 00:00 (and any number
+            # of seconds) the next day.
+            if (
+                last_end.hour == 23
+                and last_end.minute == 59
+                and start.hour == 0
+                and start.minute == 0
+                and start.date() == last_end.date() + timedelta(days=1)
+            ):
+                result[-1] = (last_start, max(last_end, end))
                 continue
-            # Intervals that aren't on the running tally date break the streak.
-            # This check is for malformed data in `available_intervals` where a
-            # day is skipped.
-            if item0_date != tally_date or item1_date != tally_date:
-                break
-            # Intervals that aren't on the end date should end at 23:59 (and any
-            # number of seconds).
-            if item1_date != end_date and (item[1].hour != 23 or item[1].minute != 59):
-                break
-            # Intervals that aren't on the start date should start at 00:00 (and
-            # any number of seconds).
-            if item0_date != start_date and (item[0].hour != 0 or item[0].minute != 0):
-                break
-            # The next interval should be on the next day.
-            tally_date += timedelta(days=1)
-        else:
-            return True
-    return False
+        result.append((start, end))
+    return result
+
+
+def _normalized_is_fitting(normalized_intervals, start_dt, end_dt):
+    # Test whether the stretch between start_dt and end_dt is contained in one
+    # of the stretches returned by `_normalize_intervals()`.
+    # Find the last stretch starting at or before start_dt; the one starting
+    # exactly at start_dt, if any, sorts right after (start_dt,)
+    index = bisect_right(normalized_intervals, (start_dt,))
+    if index < len(normalized_intervals) and normalized_intervals[index][0] == start_dt:
+        index += 1
+    return index > 0 and normalized_intervals[index - 1][1] >= end_dt
+
+
+def _availability_is_fitting(available_intervals, start_dt, end_dt):
+    # Test whether the stretch between start_dt and end_dt is an uninterrupted
+    # stretch of time as determined by `available_intervals`.
+    return _normalized_is_fitting(
+        _normalize_intervals(available_intervals), start_dt, end_dt
+    )
+
+
+def _metrics_subject(bookings):
+    # Aggregate metrics by booking type
+    return ", ".join(sorted(set(bookings.mapped("type_id.display_name"))))
 
 
 class ResourceBooking(models.Model):
@@ -339,7 +353,15 @@ class ResourceBooking(models.Model):
         _self = self.with_context(syncing_booking_ids=self.ids)
         # Avoid sync recursion
         _self -= self.browse(self.env.context.get("syncing_booking_ids"))
+        # Mails to attendees can be sent later
+        Notification = self.env["resource.booking.notification"]
+        deferred = Notification._is_enabled()
+        if deferred:
+            _self = _self.with_context(no_mail_to_attendees=True)
+        notifications = []
         to_create, to_delete = [], _self.env["calendar.event"]
+        # Meetings that need the same changes are written together
+        to_write = defaultdict(_self.env["calendar.event"].browse)
         for one in _self:
             if one.start:
                 resource_partners = one.combination_id.resource_ids.filtered(
@@ -367,27 +389,80 @@ class ResourceBooking(models.Model):
                     res_id=False,
                 )
                 if one.meeting_id:
-                    meeting = one.meeting_id
-                    if not all(
-                        (
-                            one.meeting_id.start == one.start,
-                            one.meeting_id.stop == one.stop,
-                            one.meeting_id.duration == one.duration,
+                    changes = one._get_meeting_changes(meeting_vals)
+                    if changes:
+                        rescheduled = bool(
+                            {"duration", "start", "stop"}.intersection(changes)
                         )
-                    ):
-                        # Context to notify scheduling change
-                        meeting = meeting.with_context(from_ui=True)
-                    meeting.write(meeting_vals)
+                        key = (rescheduled, tuple(sorted(changes.items())))
+                        to_write[key] |= one.meeting_id
                 else:
                     to_create.append(meeting_vals)
             else:
                 to_delete |= one.meeting_id
         to_delete.unlink()
-        _self.env["calendar.event"].create(to_create)
+        for (rescheduled, changes), meetings in to_write.items():
+            if rescheduled:
+                # Context to notify scheduling change
+                meetings = meetings.with_context(from_ui=True)
+            meetings.write(
+                {
+                    field_name: [
+                        (cmd[0], cmd[1], list(cmd[2])) if cmd[0] == 6 else cmd
+                        for cmd in value
+                    ]
+                    if isinstance(value, tuple)
+                    else value
+                    for field_name, value in changes
+                }
+            )
+            if deferred:
+                notifications += meetings._prepare_booking_notifications(
+                    rescheduled and "calendar.calendar_template_meeting_changedate",
+                    [cmd[1] for cmd in dict(changes).get("partner_ids", ())],
+                )
+        created = _self.env["calendar.event"].create(to_create)
+        if deferred:
+            notifications += created._prepare_booking_notifications(
+                "calendar.calendar_template_meeting_invitation"
+            )
+            Notification._enqueue(notifications)
+
+    def _get_meeting_changes(self, meeting_vals):
+        """Get the values that differ between the meeting and `meeting_vals`.
+
+        :return dict:
+            Values to write in the meeting. x2many commands are returned as
+            tuples, so they can be compared among bookings.
+        """
+        meeting = self.meeting_id
+        result = {}
+        for field_name, value in meeting_vals.items():
+            field = meeting._fields[field_name]
+            current = meeting[field_name]
+            if field.type == "many2one":
+                if current.id != (value or False):
+                    result[field_name] = value
+            elif field.type in {"many2many", "one2many"}:
+                commands = []
+                for command in value:
+                    if command[0] == 6 and set(command[2]) != set(current.ids):
+                        commands.append((6, 0, tuple(command[2])))
+                    elif command[0] == 4 and command[1] not in current.ids:
+                        commands.append(tuple(command))
+                if commands:
+                    result[field_name] = tuple(commands)
+            elif (current or False) != (value or False):
+                result[field_name] = value
+        return result
 
     @api.constrains("combination_id", "meeting_id", "type_id")
+    @measured(_metrics_subject, lambda bookings, result: len(bookings))
     def _check_scheduling(self):
         """Scheduled bookings must have no conflicts."""
+        # Bulk creation validates all bookings together at the end
+        if self.env.context.get("resource_booking_bulk"):
+            return
         # Nothing to do if no bookings are scheduled
         has_meeting = self.filtered("meeting_id")
         if not has_meeting:
@@ -404,19 +479,16 @@ class ResourceBooking(models.Model):
                 % ("\n- ".join(missing_rbc.mapped("display_name")))
             )
         # Ensure all bookings fit in their type and resources calendars
-        unfitting_bookings = has_meeting
+        unfitting_bookings = self.browse()
         now = fields.Datetime.now()
-        for booking in has_meeting:
-            # Ignore if the event already happened
-            already_happened = booking.stop and booking.stop < now
-            if already_happened:
-                unfitting_bookings -= booking
-                continue
-            start_dt = fields.Datetime.context_timestamp(self, booking["start"])
-            end_dt = fields.Datetime.context_timestamp(self, booking["stop"])
-            available_intervals = booking._get_intervals(start_dt, end_dt)
-            if _availability_is_fitting(available_intervals, start_dt, end_dt):
-                unfitting_bookings -= booking
+        # Ignore if the event already happened
+        pending = has_meeting.filtered(lambda one: not one.stop or one.stop >= now)
+        # Bookings sharing type and combination share intervals
+        groups = defaultdict(self.browse)
+        for booking in pending:
+            groups[booking.type_id, booking.combination_id] |= booking
+        for bookings in groups.values():
+            unfitting_bookings |= bookings._get_unfitting_bookings()
         # Explain which bookings failed validation
         if unfitting_bookings:
             raise ValidationError(
@@ -428,11 +500,121 @@ class ResourceBooking(models.Model):
                 % "\n- ".join(unfitting_bookings.mapped("display_name"))
             )
 
+    @api.model
+    def _check_scheduling_search(self, domain, batch_size=1000):
+        """Check scheduling of bookings matching the domain that didn't end.
+
+        Bookings that already happened or have no meeting are discarded in
+        the database, and the rest are validated in batches, so checking
+        resources with a long history doesn't load it all at once.
+        """
+        # Bulk creation validates all bookings together at the end
+        if self.env.context.get("resource_booking_bulk"):
+            return
+        bookings = self.search(
+            expression.AND(
+                [
+                    domain,
+                    [
+                        ("meeting_id", "!=", False),
+                        ("stop", ">=", fields.Datetime.now()),
+                    ],
+                ]
+            )
+        )
+        for booking_ids in split_every(batch_size, bookings.ids, list):
+            bookings.browse(booking_ids)._check_scheduling()
+
+    def _get_unfitting_bookings(self):
+        """Get bookings that don't fit in their calendars or collide.
+
+        All bookings must share type and combination. Work intervals and busy
+        meetings are fetched only once for the whole span of all bookings.
+        """
+        combination = self.mapped("combination_id")
+        combination.ensure_one()
+        dates = {
+            booking: tuple(
+                fields.Datetime.context_timestamp(self, dt)
+                for dt in (booking.start, booking.stop)
+            )
+            for booking in self
+        }
+        window_start = min(start for start, _stop in dates.values())
+        window_end = max(stop for _start, stop in dates.values())
+        work_intervals = _normalize_intervals(
+            self[:1]._get_intervals(window_start, window_end, combination, busy=False)
+        )
+        # Read busy rows only once, sorted by start, to sweep them below
+        busy_rows = [
+            (busy.start, busy.stop, busy.booking_id.id, busy.resource_id.id)
+            for busy in self.env["resource.busy.interval"]
+            .sudo()
+            .search(
+                [
+                    ("resource_id", "in", combination.resource_ids.ids),
+                    ("start", "<", max(self.mapped("stop"))),
+                    ("stop", ">", min(self.mapped("start"))),
+                ],
+                order="start",
+            )
+        ]
+        # Lines of other active bookings can't collide with the lines of
+        # these ones, because the database forbids it when lines are synced;
+        # any other busy time (plain meetings, bookings without lines) can
+        Line = self.env["resource.booking.line"].sudo()
+        booked = set()
+        if Line._is_overlap_forbidden():
+            booked = {
+                (line.booking_id.id, line.resource_id.id)
+                for line in Line.search(
+                    [
+                        ("booking_id.active", "=", True),
+                        ("resource_id", "in", combination.resource_ids.ids),
+                        ("start", "<", max(self.mapped("stop"))),
+                        ("stop", ">", min(self.mapped("start"))),
+                    ]
+                )
+            }
+        now = fields.Datetime.now()
+        result = self.browse()
+        pending = iter(busy_rows)
+        next_busy = next(pending, None)
+        ongoing = []
+        for booking in self.sorted("start"):
+            start_dt, end_dt = dates[booking]
+            if not _normalized_is_fitting(work_intervals, start_dt, end_dt):
+                result |= booking
+                continue
+            start, stop = booking.start, booking.stop
+            # Bookings are sorted by start, so busy rows that ended before
+            # this one starts can't collide with any of the next ones
+            while next_busy and next_busy[0] < stop:
+                ongoing.append(next_busy)
+                next_busy = next(pending, None)
+            ongoing = [busy for busy in ongoing if busy[1] > start]
+            # Only bookings that will have lines are protected by the database
+            has_lines = booking.active and booking.meeting_id.active and stop >= now
+            # Any meeting, except the booking's own one, makes it collide
+            for busy_start, _busy_stop, booking_id, resource_id in ongoing:
+                if (
+                    booking_id != booking.id
+                    and not (has_lines and (booking_id, resource_id) in booked)
+                    and busy_start < stop
+                ):
+                    result |= booking
+                    break
+        return result
+
     def _get_calendar_context(self, year=None, month=None, now=None):
         """Get the required context for the calendar view in the portal.
 
         See the `resource_booking.scheduling_calendar` view.
 
+        Only slots of the first week that can have them are computed here.
+        The rest of weeks are listed in `lazy_weeks`, so the page loads them
+        afterwards through the slots JSON route.
+
         :param int year: Year of the calendar to be displayed.
         :param int month: Month of the calendar to be displayed.
         :param datetime now: Represents the current datetime.
@@ -448,10 +630,23 @@ class ResourceBooking(models.Model):
         start = start.replace(hour=0, minute=0, second=0, microsecond=0)
         lang = self.env["res.lang"]._lang_get(self.env.lang or self.env.user.lang)
         weekday_names = dict(lang.fields_get(["week_start"])["week_start"]["selection"])
-        slots = self._get_available_slots(start, start + month1)
+        month_calendar = calendar.Calendar(int(lang.week_start) - 1)
+        weeks = month_calendar.monthdatescalendar(start.year, start.month)
+        # Past weeks have no slots; render the first one that can have them
+        eager_week = next((week for week in weeks if week[-1] >= now.date()), weeks[-1])
+        tz = self.env["resource.calendar"]._get_context_timezone()
+        eager_start, eager_end = (
+            tz.localize(datetime.combine(day, time.min))
+            for day in (eager_week[0], eager_week[-1] + timedelta(days=1))
+        )
+        slots = self._get_available_slots(
+            max(start, eager_start), min(start + month1, eager_end)
+        )
+        lazy_weeks = [week for week in weeks if week[0] > eager_week[-1]]
         return {
             "booking": self,
-            "calendar": calendar.Calendar(int(lang.week_start) - 1),
+            "calendar": month_calendar,
+            "lazy_weeks": lazy_weeks,
             "now": now,
             "res_lang": lang,
             "slots": slots,
@@ -459,6 +654,27 @@ class ResourceBooking(models.Model):
             "weekday_names": weekday_names,
         }
 
+    def _get_available_slots_compact(self, start_date, end_date):
+        """Get available slots between two dates, in a compact format.
+
+        Used by the portal to load slots on demand.
+
+        :param date start_date: First day to search slots.
+        :param date end_date: Day after the last one to search slots.
+        :return dict: Slot start epoch timestamps, indexed by ISO date.
+        :raise ValidationError: If the context timezone is unknown.
+        """
+        tz = self.env["resource.calendar"]._get_context_timezone(strict=True)
+        start, end = (
+            tz.localize(datetime.combine(day, time.min))
+            for day in (start_date, end_date)
+        )
+        slots = self._get_available_slots(start, end)
+        return {
+            day.isoformat(): [slot.timestamp() for slot in day_slots]
+            for day, day_slots in slots.items()
+        }
+
     @api.model
     def _get_name_formatted(self, partner, type_, meeting=None):
         """Produce a beautifully formatted name."""
@@ -475,13 +691,18 @@ class ResourceBooking(models.Model):
             return self.combination_id
         # If there's a combination already, put it 1st (highest priority)
         sorted_combinations = self.combination_id + (
-            self.type_id._get_combinations_priorized() - self.combination_id
+            self.type_id._get_combinations_priorized(self.start.date())
+            - self.combination_id
         )
         start_dt = fields.Datetime.context_timestamp(self, self.start)
         end_dt = fields.Datetime.context_timestamp(self, self.stop)
+        # Evaluate all candidates sharing the work of common resources
+        intervals_by_combination = self._get_intervals_batch(
+            start_dt, end_dt, sorted_combinations
+        )
         # Get 1st combination available in the desired interval
         for combination in sorted_combinations:
-            available_intervals = self._get_intervals(start_dt, end_dt, combination)
+            available_intervals = intervals_by_combination[combination.id]
             if _availability_is_fitting(available_intervals, start_dt, end_dt):
                 return combination
         # Tell portal user there's no combination available
@@ -494,44 +715,127 @@ class ResourceBooking(models.Model):
                 )
             )
 
+    @measured(_metrics_subject)
+    def _get_next_available_slots(self, start_dt, count=1, max_days=None):
+        """Get the first available slots for scheduling current booking.
+
+        Slots are searched forward in growing windows of whole days, stopping
+        as soon as enough are found. Each window extends by the booking
+        duration, so slots spanning across windows are found too, and results
+        match those of `_get_available_slots()`.
+
+        :param datetime start_dt: Search slots starting from here (tz-aware).
+        :param int count: How many slots to find.
+        :param int max_days: Stop searching after these days.
+        :return list: Up to `count` sorted slot starts, as tz-aware datetimes.
+        :raise ValidationError: If the context timezone is unknown.
+        """
+        result = []
+        tz = self.env["resource.calendar"]._get_context_timezone(strict=True)
+        duration = timedelta(hours=self.duration)
+        day = start_dt.astimezone(tz).date()
+        last_day = day + timedelta(days=max_days or NEXT_SLOTS_MAX_DAYS)
+        window_days = NEXT_SLOTS_FIRST_WINDOW_DAYS
+        while len(result) < count and day < last_day:
+            next_day = min(day + timedelta(days=window_days), last_day)
+            window_start, window_end = (
+                tz.localize(datetime.combine(one, time.min)) for one in (day, next_day)
+            )
+            slots = self._get_available_slots(window_start, window_end + duration)
+            result += [
+                slot
+                for day_slots in slots.values()
+                for slot in day_slots
+                if start_dt <= slot < window_end
+            ]
+            day = next_day
+            window_days *= 2
+        return result[:count]
+
+    @measured(_metrics_subject, lambda booking, result: sum(map(len, result.values())))
     def _get_available_slots(self, start_dt, end_dt):
         """Return available slots for scheduling current booking."""
         result = {}
         now = fields.Datetime.context_timestamp(self, fields.Datetime.now())
-        slot_duration = timedelta(hours=self.type_id.duration)
-        booking_duration = timedelta(hours=self.duration)
-        current = max(
-            start_dt, now + timedelta(hours=self.type_id.modifications_deadline)
+        earliest = now + timedelta(hours=self.type_id.modifications_deadline)
+        # Slots are shared among requests with the same scenario
+        SlotCache = self.env["resource.booking.slot.cache"]
+        combinations = self.combination_id or self.mapped(
+            "type_id.combination_rel_ids.combination_id"
         )
-        available_intervals = self._get_intervals(current, end_dt)
-        while current and current < end_dt:
-            slot_start = self.type_id._get_next_slot_start(current)
-            if current != slot_start:
-                current = slot_start
-                continue
-            current_interval = Intervals([(current, current + booking_duration, self)])
-            for start, end, _meta in available_intervals & current_interval:
-                if end - start == booking_duration:
-                    result.setdefault(current.date(), [])
-                    result[current.date()].append(current)
-                # I actually only care about the 1st interval, if any
-                break
-            current += slot_duration
+        slots = SlotCache._get_slots(self, combinations, start_dt, end_dt)
+        if slots is None:
+            slots = self._compute_available_slots(start_dt, end_dt)
+            SlotCache._set_slots(self, combinations, start_dt, end_dt, slots)
+        for slot in slots:
+            if slot >= earliest:
+                result.setdefault(slot.date(), [])
+                result[slot.date()].append(slot)
         return result
 
-    def _get_intervals(self, start_dt, end_dt, combination=None):
-        """Get available intervals for this booking."""
-        # Get all intervals except those from current booking
+    def _compute_available_slots(self, start_dt, end_dt):
+        """Compute all slot starts that fit the current booking.
+
+        Unlike `_get_available_slots()`, modification deadlines are ignored,
+        so the result can be reused later.
+        """
+        available_intervals = self._get_intervals(start_dt, end_dt)
+        return self.type_id._get_fitting_slots(
+            available_intervals, start_dt, end_dt, timedelta(hours=self.duration)
+        )
+
+    def _get_analyzed_booking_id(self, busy=True):
+        """Get the ID to exclude from busy meetings when analyzing this booking."""
         try:
-            booking_id = self.id or self._origin.id or -1
+            return busy and (self.id or self._origin.id or -1)
         except AttributeError:
-            booking_id = -1
+            return busy and -1
+
+    def _get_intervals_batch(self, start_dt, end_dt, combinations, busy=True):
+        """Get available intervals for this booking with each combination.
+
+        Each distinct resource and calendar is computed only once, no matter
+        how many candidate combinations share it.
+
+        :return dict: `Intervals` indexed by combination ID.
+        """
+        # Get all intervals except those from current booking
+        booking_id = self._get_analyzed_booking_id(busy)
+        # Detached compatibility with hr_holidays_public
+        booking = self.with_context(
+            analyzing_booking=booking_id, exclude_public_holidays=True
+        )
+        # RBT calendar uses no resources to restrict bookings
+        type_intervals = (
+            booking.type_id.resource_calendar_id._work_intervals_batch_cached(
+                start_dt, end_dt
+            )[False]
+        )
+        combination_intervals = combinations.with_context(
+            analyzing_booking=booking_id
+        )._get_intervals_batch(start_dt, end_dt)
+        return {
+            combination_id: type_intervals & intervals
+            for combination_id, intervals in combination_intervals.items()
+        }
+
+    @measured(_metrics_subject)
+    def _get_intervals(self, start_dt, end_dt, combination=None, busy=True):
+        """Get available intervals for this booking.
+
+        Use `busy=False` to ignore meetings and get only the intervals allowed
+        by calendars and leaves.
+        """
+        # Get all intervals except those from current booking
+        booking_id = self._get_analyzed_booking_id(busy)
         # Detached compatibility with hr_holidays_public
         booking = self.with_context(
             analyzing_booking=booking_id, exclude_public_holidays=True
         )
         # RBT calendar uses no resources to restrict bookings
-        result = booking.type_id.resource_calendar_id._work_intervals(start_dt, end_dt)
+        result = booking.type_id.resource_calendar_id._work_intervals_batch_cached(
+            start_dt, end_dt
+        )[False]
         # Restrict with the chosen combination, or to at least one of the
         # available ones
         combinations = (
@@ -549,13 +853,46 @@ class ResourceBooking(models.Model):
         result._sync_meeting()
         return result
 
+    @api.model
+    def create_bulk(self, vals_list, batch_size=500):
+        """Create lots of bookings efficiently, i.e. when importing them.
+
+        Bookings and their meetings are created in batches, and each batch
+        is validated at once after all its meetings exist, instead of
+        validating each booking while its meeting is being created.
+
+        :param list vals_list: Values for each booking.
+        :param int batch_size: Amount of bookings created at once.
+        :return: Created bookings.
+        """
+        result = self.browse()
+        bulk_self = self.with_context(resource_booking_bulk=True)
+        for chunk in split_every(batch_size, vals_list, list):
+            bookings = bulk_self.create(chunk).with_context(resource_booking_bulk=False)
+            bookings._check_scheduling()
+            result |= bookings
+        return result.with_env(self.env)
+
     def write(self, vals):
         """Sync booking with meeting if needed."""
-        # On a database with lots of recurrent calendar events we could get serious
-        # performance downgrades. As we'll be computing them with _sync_meeting later
-        # we'll be avoiding triggering on the super call (i.e. compute methods)
-        result = super(ResourceBooking, self.with_context(virtual_id=False)).write(vals)
+        before = {
+            one.id: (one.active, one.combination_id, one.meeting_id) for one in self
+        }
+        result = super().write(vals)
         self._sync_meeting()
+        # The combination is computed, so it can change without being written
+        changed = self.filtered(
+            lambda one: before[one.id]
+            != (one.active, one.combination_id, one.meeting_id)
+        )
+        if changed:
+            meetings = changed.mapped("meeting_id")
+            for one in changed:
+                meetings |= before[one.id][2]
+            meetings._refresh_busy_intervals()
+            # Constraints only run for written fields
+            if not {"combination_id", "meeting_id", "type_id"}.intersection(vals):
+                changed._check_scheduling()
         return result
 
     def unlink(self):
@@ -606,6 +943,24 @@ class ResourceBooking(models.Model):
             )
         return result
 
+    def _message_auto_subscribe_notify(self, partner_ids, template):
+        """Send assignation notifications later, if deferred."""
+        Notification = self.env["resource.booking.notification"]
+        if not Notification._is_enabled():
+            return super()._message_auto_subscribe_notify(partner_ids, template)
+        if partner_ids and template:
+            Notification._enqueue(
+                [
+                    {
+                        "booking_id": one.id,
+                        "kind": "assignation",
+                        "partner_ids": [(6, 0, partner_ids)],
+                        "template": template,
+                    }
+                    for one in self
+                ]
+            )
+
     def _message_get_suggested_recipients(self):
         """Suggest related partners."""
         recipients = super()._message_get_suggested_recipients()
@@ -664,6 +1019,25 @@ class ResourceBooking(models.Model):
             attendees_to_confirm.write({"state": "accepted"})
         self.recompute()
 
+    def _schedule(self, start):
+        """Schedule the booking at the given start.
+
+        The combination is picked if it is auto-assigned, then the booking is
+        validated and its meeting is synced, all at once. If anything fails,
+        the booking is left as it was.
+
+        :param datetime start: Naive UTC start.
+        :raise ValidationError: If it cannot be scheduled then.
+        """
+        self.ensure_one()
+        try:
+            with self.env.cr.savepoint():
+                self.write({"start": start})
+                self.flush()
+        except ValidationError:
+            self.invalidate_cache()
+            raise
+
     def action_unschedule(self):
         """Remove associated meetings."""
         self.mapped("meeting_id").unlink()
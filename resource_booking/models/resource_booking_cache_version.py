@@ -0,0 +1,83 @@
+# Copyright 2026 Tecnativa
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import api, fields, models
+
+
+class ResourceBookingCacheVersion(models.Model):
+    """Versions of records whose changes make cached availability obsolete.
+
+    Invalidating a record appends a new version instead of updating a row in
+    place, so transactions invalidating the same records concurrently never
+    conflict. Versions come from a sequence, so they are never reused, and
+    the current version of a record is the highest one.
+    """
+
+    _name = "resource.booking.cache.version"
+    _description = "Resource booking cache version"
+    _log_access = False
+    _order = "version"
+
+    res_model = fields.Char(readonly=True, required=True)
+    res_id = fields.Integer(readonly=True, required=True)
+    version = fields.Integer(readonly=True, required=True)
+
+    def init(self):
+        """Create the version sequence and the index to get current versions."""
+        cr = self.env.cr
+        cr.execute("CREATE SEQUENCE IF NOT EXISTS resource_booking_cache_version_seq")
+        cr.execute(
+            """
+            CREATE INDEX IF NOT EXISTS resource_booking_cache_version_record_index
+            ON resource_booking_cache_version (res_model, res_id, version)
+            """
+        )
+
+    @api.model
+    def _bump(self, records):
+        """Make everything cached with the current state of records obsolete."""
+        if not records:
+            return
+        self.env.cr.execute(
+            """
+            INSERT INTO resource_booking_cache_version (res_model, res_id, version)
+            SELECT %s, res_id, nextval('resource_booking_cache_version_seq')
+            FROM unnest(%s) AS res_id
+            """,
+            (records._name, list(records.ids)),
+        )
+
+    @api.model
+    def _get_versions(self, records):
+        """Get current versions of records.
+
+        :return dict: Version indexed by record ID; 0 if never invalidated.
+        """
+        result = dict.fromkeys(records.ids, 0)
+        if not records:
+            return result
+        self.env.cr.execute(
+            """
+            SELECT res_id, MAX(version)
+            FROM resource_booking_cache_version
+            WHERE res_model = %s AND res_id IN %s
+            GROUP BY res_id
+            """,
+            (records._name, tuple(records.ids)),
+        )
+        result.update(self.env.cr.fetchall())
+        return result
+
+    @api.autovacuum
+    def _gc_superseded(self):
+        """Remove versions that are not current anymore."""
+        self.env.cr.execute(
+            """
+            DELETE FROM resource_booking_cache_version AS old
+            USING resource_booking_cache_version AS new
+            WHERE
+                new.res_model = old.res_model
+                AND new.res_id = old.res_id
+                AND new.version > old.version
+            """
+        )
@@ -1,10 +1,18 @@
 # Copyright 2021 Tecnativa - Jairo Llopis
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
+from collections import defaultdict
+from datetime import timedelta
+
 from odoo import _, api, fields, models
 
 from odoo.addons.resource.models.resource import Intervals
 
+from ..metrics import measured
+
+# Days around the booking start considered to compute combination loads
+LOAD_WINDOW_DAYS = 14
+
 
 class ResourceBookingCombination(models.Model):
     _name = "resource.booking.combination"
@@ -65,22 +73,87 @@ class ResourceBookingCombination(models.Model):
     @api.constrains("booking_ids", "forced_calendar_id", "resource_ids")
     def _check_bookings_scheduling(self):
         """Scheduled bookings must have no conflicts."""
-        bookings = self.mapped("booking_ids")
-        return bookings._check_scheduling()
+        return self.env["resource.booking"]._check_scheduling_search(
+            [("combination_id", "in", self.ids)]
+        )
+
+    def write(self, vals):
+        """Update busy intervals when combination resources change."""
+        result = super().write(vals)
+        if "resource_ids" in vals:
+            self.mapped("booking_ids.meeting_id")._refresh_busy_intervals()
+        if {"active", "forced_calendar_id", "resource_ids"}.intersection(vals):
+            self.env["resource.booking.slot.cache"]._invalidate(combinations=self)
+        return result
 
+    @measured(lambda combinations: ", ".join(combinations.mapped("display_name")))
     def _get_intervals(self, start_dt, end_dt):
         """Get available intervals for this booking combination."""
-        base = Intervals([(start_dt, end_dt, self)])
         result = Intervals([])
+        for intervals in self._get_intervals_batch(start_dt, end_dt).values():
+            result |= intervals
+        return result
+
+    def _get_intervals_batch(self, start_dt, end_dt):
+        """Get available intervals for each booking combination.
+
+        Work intervals are computed once per calendar for all its resources,
+        and reused by all combinations that share them.
+
+        :return dict: `Intervals` indexed by combination ID.
+        """
+        base = Intervals([(start_dt, end_dt, self)])
         # Detached compatibility with hr_holidays_public
-        for combination in self.with_context(exclude_public_holidays=True):
+        combinations = self.with_context(exclude_public_holidays=True)
+        resources_by_calendar = defaultdict(lambda: self.env["resource.resource"])
+        for combination in combinations:
+            for res in combination.resource_ids:
+                calendar = combination.forced_calendar_id or res.calendar_id
+                resources_by_calendar[calendar] |= res
+        work_intervals = {}
+        for calendar, resources in resources_by_calendar.items():
+            batch = calendar._work_intervals_batch_cached(start_dt, end_dt, resources)
+            for res in resources:
+                work_intervals[calendar, res] = batch[res.id]
+        result = {}
+        for combination in combinations:
             combination_intervals = base
             for res in combination.resource_ids:
                 if not combination_intervals:
                     break  # Can't restrict more
                 calendar = combination.forced_calendar_id or res.calendar_id
-                combination_intervals &= calendar._work_intervals(start_dt, end_dt, res)
-            result |= combination_intervals
+                combination_intervals &= work_intervals[calendar, res]
+            result[combination.id] = combination_intervals
+        return result
+
+    def _get_booking_loads(self, day):
+        """Count scheduled bookings of each combination around a day.
+
+        Loads are summed from the counters kept in
+        `resource.booking.combination.load`, so no booking is read here.
+        Bookings count whether they already happened or not.
+
+        :param date day: Day in the middle of the counted period.
+        :return dict: Booking count, indexed by combination ID.
+        """
+        result = dict.fromkeys(self.ids, 0)
+        if not self:
+            return result
+        window = timedelta(days=LOAD_WINDOW_DAYS)
+        # Pending booking updates fire the counting trigger when flushed
+        self.env["resource.booking"].flush(
+            ["active", "combination_id", "meeting_id", "start"]
+        )
+        self.env.cr.execute(
+            """
+            SELECT combination_id, SUM(booking_count)
+            FROM resource_booking_combination_load
+            WHERE combination_id IN %s AND date BETWEEN %s AND %s
+            GROUP BY combination_id
+            """,
+            (tuple(self.ids), day - window, day + window),
+        )
+        result.update(self.env.cr.fetchall())
         return result
 
     def action_open_bookings(self):
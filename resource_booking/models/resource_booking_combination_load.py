@@ -0,0 +1,144 @@
+# Copyright 2026 Tecnativa
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import api, fields, models
+
+
+class ResourceBookingCombinationLoad(models.Model):
+    """Deltas of scheduled bookings assigned to each combination on each day.
+
+    A database trigger appends a delta whenever a booking starts or stops
+    counting for a combination and day: when it is scheduled, moved,
+    reassigned, archived or canceled, and also when its meeting or itself
+    are removed by a database cascade. Appending instead of updating a row
+    per day means concurrent transactions never conflict on counters.
+
+    The load of a combination on a day is the sum of its deltas. The
+    autovacuum recounts them from bookings, leaving one row per day.
+    """
+
+    _name = "resource.booking.combination.load"
+    _description = "Resource booking combination load"
+    _log_access = False
+    _order = "date, combination_id"
+
+    combination_id = fields.Many2one(
+        comodel_name="resource.booking.combination",
+        string="Combination",
+        ondelete="cascade",
+        readonly=True,
+        required=True,
+    )
+    date = fields.Date(readonly=True, required=True)
+    booking_count = fields.Integer(readonly=True)
+
+    def init(self):
+        """Count bookings in the database, and recount existing ones."""
+        cr = self.env.cr
+        cr.execute(
+            """
+            CREATE INDEX IF NOT EXISTS resource_booking_combination_load_date_index
+            ON resource_booking_combination_load (combination_id, date)
+            """
+        )
+        cr.execute(
+            """
+            CREATE OR REPLACE FUNCTION resource_booking_combination_load_count()
+            RETURNS trigger AS $$
+            DECLARE
+                old_counted boolean := false;
+                new_counted boolean := false;
+            BEGIN
+                IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    old_counted := (
+                        OLD.active
+                        AND OLD.meeting_id IS NOT NULL
+                        AND OLD.start IS NOT NULL
+                        AND OLD.combination_id IS NOT NULL
+                    );
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    new_counted := (
+                        NEW.active
+                        AND NEW.meeting_id IS NOT NULL
+                        AND NEW.start IS NOT NULL
+                        AND NEW.combination_id IS NOT NULL
+                    );
+                END IF;
+                -- Records of other operations aren't assigned; check apart
+                IF TG_OP = 'UPDATE' AND old_counted AND new_counted THEN
+                    IF OLD.combination_id = NEW.combination_id
+                        AND OLD.start::date = NEW.start::date
+                    THEN
+                        RETURN NULL;
+                    END IF;
+                END IF;
+                IF old_counted THEN
+                    -- Skip combinations being removed; their loads cascade
+                    IF EXISTS (
+                        SELECT 1 FROM resource_booking_combination
+                        WHERE id = OLD.combination_id
+                    ) THEN
+                        INSERT INTO resource_booking_combination_load
+                            (combination_id, date, booking_count)
+                        VALUES (OLD.combination_id, OLD.start::date, -1);
+                    END IF;
+                END IF;
+                IF new_counted THEN
+                    INSERT INTO resource_booking_combination_load
+                        (combination_id, date, booking_count)
+                    VALUES (NEW.combination_id, NEW.start::date, 1);
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            """
+        )
+        cr.execute(
+            """
+            DROP TRIGGER IF EXISTS resource_booking_combination_load_count
+            ON resource_booking
+            """
+        )
+        cr.execute(
+            """
+            CREATE TRIGGER resource_booking_combination_load_count
+            AFTER INSERT OR DELETE
+                OR UPDATE OF active, combination_id, meeting_id, start
+            ON resource_booking
+            FOR EACH ROW EXECUTE PROCEDURE resource_booking_combination_load_count()
+            """
+        )
+        self._recount()
+
+    @api.model
+    def _recount(self):
+        """Replace all deltas by the bookings each combination has per day.
+
+        Deltas appended meanwhile by other transactions are not visible here,
+        and neither are their bookings, so they stay valid.
+        """
+        self.env["resource.booking"].flush(
+            ["active", "combination_id", "meeting_id", "start"]
+        )
+        self.env.cr.execute(
+            """
+            DELETE FROM resource_booking_combination_load;
+            INSERT INTO resource_booking_combination_load
+                (combination_id, date, booking_count)
+            SELECT combination_id, start::date, COUNT(*)
+            FROM resource_booking
+            WHERE
+                active
+                AND meeting_id IS NOT NULL
+                AND start IS NOT NULL
+                AND combination_id IS NOT NULL
+            GROUP BY combination_id, start::date
+            """
+        )
+        self.invalidate_cache()
+
+    @api.autovacuum
+    def _gc_deltas(self):
+        """Compact deltas into one row per combination and day."""
+        self._recount()
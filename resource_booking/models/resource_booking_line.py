@@ -0,0 +1,179 @@
+# Copyright 2026 Tecnativa
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+import logging
+
+from psycopg2 import Error as PsycopgError, IntegrityError
+
+from odoo import _, api, fields, models
+from odoo.exceptions import ValidationError
+from odoo.tools import mute_logger, ormcache, split_every
+
+_logger = logging.getLogger(__name__)
+
+EXCLUSION_NAME = "resource_booking_line_no_overlap"
+
+
+class ResourceBookingLine(models.Model):
+    """Resources booked by each scheduled booking.
+
+    When possible, the database forbids overlapping lines for the same
+    resource, so bookings confirmed in parallel transactions can't collide.
+    Only bookings that didn't end yet are tracked.
+    """
+
+    _name = "resource.booking.line"
+    _description = "Resource booking line"
+    _order = "start, id"
+    _log_access = False
+
+    booking_id = fields.Many2one(
+        comodel_name="resource.booking",
+        string="Booking",
+        index=True,
+        ondelete="cascade",
+        readonly=True,
+        required=True,
+    )
+    meeting_id = fields.Many2one(
+        comodel_name="calendar.event",
+        string="Meeting",
+        index=True,
+        ondelete="cascade",
+        readonly=True,
+        required=True,
+    )
+    resource_id = fields.Many2one(
+        comodel_name="resource.resource",
+        string="Resource",
+        index=True,
+        ondelete="cascade",
+        readonly=True,
+        required=True,
+    )
+    start = fields.Datetime(readonly=True, required=True)
+    stop = fields.Datetime(readonly=True, required=True)
+
+    def init(self):
+        """Forbid overlapping lines for the same resource."""
+        cr = self.env.cr
+        cr.execute("SELECT 1 FROM pg_constraint WHERE conname = %s", (EXCLUSION_NAME,))
+        if cr.fetchone():
+            return
+        try:
+            with cr.savepoint(), mute_logger("odoo.sql_db"):
+                cr.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+                cr.execute(
+                    """
+                    ALTER TABLE resource_booking_line
+                    ADD CONSTRAINT resource_booking_line_no_overlap
+                    EXCLUDE USING gist (
+                        resource_id WITH =,
+                        tsrange(start, stop) WITH &&
+                    )
+                    """
+                )
+        except PsycopgError as error:
+            _logger.warning(
+                "Cannot forbid overlapping bookings in the database, "
+                "they will be detected only by the ORM: %s",
+                error,
+            )
+
+    @ormcache()
+    def _is_overlap_forbidden(self):
+        """Know if the database forbids overlapping lines."""
+        self.env.cr.execute(
+            "SELECT 1 FROM pg_constraint WHERE conname = %s", (EXCLUSION_NAME,)
+        )
+        return bool(self.env.cr.fetchone())
+
+    @api.model
+    def _prepare_values(self, bookings):
+        """Get the lines that should exist for the given bookings."""
+        now = fields.Datetime.now()
+        vals_list = []
+        for booking in bookings:
+            meeting = booking.meeting_id
+            if not (booking.active and meeting.active and meeting.stop >= now):
+                continue
+            for resource in booking.combination_id.resource_ids:
+                vals_list.append(
+                    {
+                        "booking_id": booking.id,
+                        "meeting_id": meeting.id,
+                        "resource_id": resource.id,
+                        "start": meeting.start,
+                        "stop": meeting.stop,
+                    }
+                )
+        return vals_list
+
+    @api.model
+    def _sync(self, bookings):
+        """Update lines of the given bookings.
+
+        :raise ValidationError: If some booked resource is already booked.
+        """
+        self = self.sudo()
+        bookings = bookings.sudo().with_context(active_test=False).exists()
+        old = {
+            (line.booking_id.id, line.resource_id.id): line
+            for line in self.search([("booking_id", "in", bookings.ids)])
+        }
+        to_create = []
+        outdated = self.browse()
+        for vals in self._prepare_values(bookings):
+            line = old.pop((vals["booking_id"], vals["resource_id"]), None)
+            if line and (line.meeting_id.id, line.start, line.stop) == (
+                vals["meeting_id"],
+                vals["start"],
+                vals["stop"],
+            ):
+                continue
+            outdated |= line or self.browse()
+            to_create.append(vals)
+        to_remove = outdated | self.browse([line.id for line in old.values()])
+        if not (to_remove or to_create):
+            return
+        try:
+            with self.env.cr.savepoint(), mute_logger("odoo.sql_db"):
+                to_remove.unlink()
+                self.create(to_create)
+        except IntegrityError:
+            self.invalidate_cache()
+            raise ValidationError(
+                _(
+                    "Cannot schedule these bookings because all resources "
+                    "are busy:\n\n- %s"
+                )
+                % "\n- ".join(
+                    bookings.browse(
+                        list({vals["booking_id"] for vals in to_create})
+                    ).mapped("display_name")
+                )
+            )
+
+    @api.model
+    def _rebuild(self):
+        """Recompute lines of all bookings that didn't end yet.
+
+        Bookings that already collide are skipped and logged.
+        """
+        self = self.sudo()
+        self.search([]).unlink()
+        bookings = self.env["resource.booking"].search(
+            [("meeting_id", "!=", False), ("stop", ">=", fields.Datetime.now())]
+        )
+        for booking_ids in split_every(1000, bookings.ids):
+            chunk = bookings.browse(booking_ids)
+            try:
+                self._sync(chunk)
+            except ValidationError:
+                for booking in chunk:
+                    try:
+                        self._sync(booking)
+                    except ValidationError:
+                        _logger.warning(
+                            "Booking %s collides with other bookings", booking.id
+                        )
@@ -0,0 +1,73 @@
+# Copyright 2026 Tecnativa
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+import json
+import logging
+
+from odoo import _, api, fields, models
+
+from .. import metrics
+
+_logger = logging.getLogger(__name__)
+
+
+class ResourceBookingMetric(models.TransientModel):
+    """Snapshot of the availability metrics of the current worker."""
+
+    _name = "resource.booking.metric"
+    _description = "Resource booking performance metric"
+    _order = "seconds DESC, id"
+
+    name = fields.Char("Method", readonly=True)
+    subject = fields.Char(
+        readonly=True, help="Booking types or combinations involved in the calls."
+    )
+    calls = fields.Integer(readonly=True)
+    seconds = fields.Float(readonly=True, digits=(16, 6), help="Total wall time.")
+    average_ms = fields.Float(
+        "Average (ms)",
+        compute="_compute_average_ms",
+        digits=(16, 3),
+    )
+    queries = fields.Integer(readonly=True, help="Total SQL queries.")
+    items = fields.Integer(
+        readonly=True, help="Total events, intervals or slots processed."
+    )
+
+    @api.depends("calls", "seconds")
+    def _compute_average_ms(self):
+        for one in self:
+            one.average_ms = one.calls and one.seconds * 1000 / one.calls
+
+    @api.model
+    def action_view_metrics(self):
+        """Display metrics collected by the worker serving this request."""
+        records = self.create(
+            [
+                dict(values, name=name, subject=subject)
+                for (name, subject), values in metrics.snapshot().items()
+            ]
+        )
+        return {
+            "domain": [("id", "in", records.ids)],
+            "name": _("Performance metrics"),
+            "res_model": self._name,
+            "type": "ir.actions.act_window",
+            "view_mode": "tree",
+        }
+
+    @api.model
+    def action_reset_metrics(self):
+        """Restart collecting metrics in the current worker."""
+        metrics.reset()
+        return self.action_view_metrics()
+
+    @api.model
+    def _dump(self):
+        """Log current worker metrics in JSON, and return them."""
+        result = [
+            dict(values, name=name, subject=subject)
+            for (name, subject), values in sorted(metrics.snapshot().items())
+        ]
+        _logger.info("Resource booking metrics: %s", json.dumps(result))
+        return result
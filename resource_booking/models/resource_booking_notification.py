@@ -0,0 +1,176 @@
+# Copyright 2026 Tecnativa
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+import logging
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+# After these attempts, a notification is not retried anymore
+MAX_ATTEMPTS = 8
+# Wait before retrying a failed notification, doubled after each attempt
+RETRY_DELAY = timedelta(minutes=5)
+
+
+class ResourceBookingNotification(models.Model):
+    """Outbox of notifications of booking changes, sent after commit.
+
+    Used when the `resource_booking.deferred_notifications` system parameter
+    is enabled, so requests that schedule bookings don't wait for mails.
+    Notifications of the same booking are sent in order, and a failing one
+    blocks the next ones until it's sent or it exhausts its attempts. Failed
+    attempts are retried with an exponential backoff.
+    """
+
+    _name = "resource.booking.notification"
+    _description = "Resource booking deferred notification"
+    _order = "id"
+
+    booking_id = fields.Many2one(
+        comodel_name="resource.booking",
+        string="Booking",
+        index=True,
+        ondelete="cascade",
+        readonly=True,
+        required=True,
+    )
+    meeting_id = fields.Many2one(
+        comodel_name="calendar.event",
+        string="Meeting",
+        ondelete="cascade",
+        readonly=True,
+    )
+    kind = fields.Selection(
+        [
+            ("attendees", "Mail to meeting attendees"),
+            ("assignation", "Resource assignation"),
+        ],
+        readonly=True,
+        required=True,
+    )
+    partner_ids = fields.Many2many(
+        comodel_name="res.partner",
+        string="Recipients",
+        readonly=True,
+        help="Leave empty to notify all meeting attendees.",
+    )
+    template = fields.Char(
+        readonly=True, required=True, help="XML ID of the template to use."
+    )
+    state = fields.Selection(
+        [("pending", "Pending"), ("done", "Sent"), ("failed", "Failed")],
+        default="pending",
+        index=True,
+        readonly=True,
+        required=True,
+    )
+    attempts = fields.Integer(readonly=True)
+    last_error = fields.Text(readonly=True)
+    next_attempt = fields.Datetime(
+        index=True,
+        readonly=True,
+        help="Failed notifications are not retried before this moment.",
+    )
+
+    @api.model
+    def _is_enabled(self):
+        """Know if notifications must be deferred."""
+        return self.env.context.get(
+            "resource_booking_deferred_notifications",
+            bool(
+                self.env["ir.config_parameter"]
+                .sudo()
+                .get_param("resource_booking.deferred_notifications")
+            ),
+        )
+
+    @api.model
+    def _enqueue(self, vals_list):
+        """Queue notifications and wake up the sender."""
+        result = self.sudo().create(vals_list)
+        if result:
+            self.env.ref("resource_booking.cron_send_notifications").sudo()._trigger()
+        return result
+
+    def _send(self):
+        """Send these notifications now."""
+        notify_now = {"resource_booking_deferred_notifications": False}
+        for one in self:
+            if one.kind == "attendees":
+                attendees = one.meeting_id.attendee_ids
+                if one.partner_ids:
+                    attendees = attendees.filtered(
+                        lambda attendee: attendee.partner_id in one.partner_ids
+                    )
+                attendees.with_context(
+                    mail_notify_author=True, **notify_now
+                )._send_mail_to_attendees(one.template)
+            elif one.kind == "assignation":
+                one.booking_id.with_context(
+                    **notify_now
+                )._message_auto_subscribe_notify(one.partner_ids.ids, one.template)
+
+    @api.model
+    def _cron_send(self, limit=1000):
+        """Send pending notifications, in order for each booking."""
+        now = fields.Datetime.now()
+        # A notification waiting for its retry is the first pending one of its
+        # booking, so the rest of notifications of that booking must wait too
+        waiting = self.sudo().search(
+            [("state", "=", "pending"), ("next_attempt", ">", now)]
+        )
+        pending = self.sudo().search(
+            [
+                ("state", "=", "pending"),
+                ("booking_id", "not in", waiting.mapped("booking_id").ids),
+                "|",
+                ("next_attempt", "=", False),
+                ("next_attempt", "<=", now),
+            ],
+            limit=limit,
+        )
+        blocked_bookings = set()
+        retries = []
+        for one in pending:
+            if one.booking_id.id in blocked_bookings:
+                continue
+            try:
+                with self.env.cr.savepoint():
+                    one._send()
+            except Exception as error:
+                _logger.warning(
+                    "Cannot send booking notification %d", one.id, exc_info=True
+                )
+                attempts = one.attempts + 1
+                retry = attempts < MAX_ATTEMPTS
+                one.write(
+                    {
+                        "attempts": attempts,
+                        "last_error": str(error),
+                        "next_attempt": retry
+                        and now + RETRY_DELAY * 2 ** (attempts - 1),
+                        "state": "pending" if retry else "failed",
+                    }
+                )
+                if retry:
+                    blocked_bookings.add(one.booking_id.id)
+                    retries.append(one.next_attempt)
+                continue
+            one.write({"next_attempt": False, "state": "done"})
+        cron = self.env.ref("resource_booking.cron_send_notifications")
+        if len(pending) == limit:
+            cron._trigger()
+        elif retries:
+            cron._trigger(min(retries))
+
+    @api.autovacuum
+    def _gc_sent(self):
+        """Remove notifications sent long ago."""
+        self.sudo().search(
+            [
+                ("state", "=", "done"),
+                ("write_date", "<", fields.Datetime.now() - timedelta(days=7)),
+            ]
+        ).unlink()
@@ -0,0 +1,174 @@
+# Copyright 2026 Tecnativa
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from psycopg2 import Error as PsycopgError, IntegrityError
+from pytz import UTC
+
+from odoo import api, fields, models
+from odoo.tools import mute_logger
+
+_logger = logging.getLogger(__name__)
+
+
+class ResourceBookingSlotCache(models.Model):
+    """Available slots computed for a booking scenario.
+
+    Slots only depend on the booking type, the booking duration, the
+    candidate combinations and the requested window, so they can be shared
+    among requests. Versions of everything that affects them are part of the
+    key, so entries are never hit again once any booking, meeting, leave or
+    calendar that affects their resources changes.
+
+    Neither invalidating nor storing entries updates rows in place, so
+    concurrent confirmations touching the same resources don't conflict, and
+    entries are stored in their own transaction, so read-only requests such
+    as portal pages don't write.
+    """
+
+    _name = "resource.booking.slot.cache"
+    _description = "Resource booking available slots cache"
+    _sql_constraints = [
+        ("key_unique", "UNIQUE(key)", "Slot cache keys must be unique."),
+    ]
+
+    key = fields.Char(index=True, readonly=True, required=True)
+    type_id = fields.Many2one(
+        comodel_name="resource.booking.type",
+        string="Type",
+        index=True,
+        ondelete="cascade",
+        readonly=True,
+        required=True,
+    )
+    booking_id = fields.Many2one(
+        comodel_name="resource.booking",
+        string="Booking",
+        index=True,
+        ondelete="cascade",
+        readonly=True,
+        help="Only set when the booking has a meeting, which is not busy for itself.",
+    )
+    stop = fields.Datetime(readonly=True, required=True)
+    slots = fields.Text(readonly=True, help="Slot start timestamps, in JSON.")
+
+    @api.model
+    def _get_scope(self, booking, combinations):
+        """Get calendars and resources whose changes affect the slots."""
+        calendars = booking.type_id.resource_calendar_id
+        for combination in combinations:
+            calendars |= combination.forced_calendar_id or combination.mapped(
+                "resource_ids.calendar_id"
+            )
+        return calendars, combinations.mapped("resource_ids")
+
+    @api.model
+    def _get_key(self, booking, combinations, start_dt, end_dt):
+        """Identify the scenario of the slots to be computed.
+
+        Versions of the involved records and public holidays are part of the
+        key, so entries stored late by transactions that computed them before
+        some invalidation was committed are never hit.
+        """
+        Version = self.env["resource.booking.cache.version"]
+        calendars, resources = self._get_scope(booking, combinations)
+        return json.dumps(
+            [
+                booking.type_id.id,
+                booking.duration,
+                start_dt.isoformat(),
+                end_dt.isoformat(),
+                self.env.context.get("tz"),
+                booking._origin.id if booking.meeting_id else False,
+                sorted(Version._get_versions(booking.type_id).items()),
+                sorted(Version._get_versions(combinations).items()),
+                sorted(Version._get_versions(calendars).items()),
+                sorted(Version._get_versions(resources).items()),
+                self.env["resource.calendar"]._get_public_holidays_version(),
+            ]
+        )
+
+    @api.model
+    def _get_slots(self, booking, combinations, start_dt, end_dt):
+        """Get cached slots, or `None` if not cached.
+
+        Slots are returned as a list of tz-aware datetimes, expressed in the
+        timezone of `start_dt`, just like freshly computed ones.
+        """
+        key = self._get_key(booking, combinations, start_dt, end_dt)
+        entry = self.sudo().search([("key", "=", key)], limit=1)
+        if not entry:
+            return None
+        return [
+            datetime.fromtimestamp(timestamp, UTC).astimezone(start_dt.tzinfo)
+            for timestamp in json.loads(entry.slots)
+        ]
+
+    @api.model
+    def _set_slots(self, booking, combinations, start_dt, end_dt, slots):
+        """Store computed slots, in their own transaction."""
+        vals = {
+            "booking_id": booking._origin.id if booking.meeting_id else False,
+            "key": self._get_key(booking, combinations, start_dt, end_dt),
+            "slots": json.dumps([slot.timestamp() for slot in slots]),
+            "stop": end_dt.astimezone(UTC).replace(tzinfo=None),
+            "type_id": booking.type_id.id,
+        }
+        # Tests can't commit, and their data is invisible to other transactions
+        if getattr(threading.current_thread(), "testing", False):
+            return self._store(vals)
+        try:
+            with self.pool.cursor() as cr, mute_logger("odoo.sql_db"):
+                self.with_env(self.env(cr=cr))._store(vals)
+        except PsycopgError as error:
+            # i.e. the booking was created by the current transaction
+            _logger.debug("Cannot cache slots: %s", error)
+
+    @api.model
+    def _store(self, vals):
+        """Create a cache entry, unless a concurrent request did it."""
+        try:
+            with self.env.cr.savepoint(), mute_logger("odoo.sql_db"):
+                self.sudo().create(vals)
+        except IntegrityError:
+            pass
+
+    @api.model
+    def _invalidate(
+        self, types=None, combinations=None, resources=None, calendars=None
+    ):
+        """Make cached slots affected by changes in the given records obsolete.
+
+        Only new versions are added, so slots computed concurrently with the
+        old data can't be hit anymore. Obsolete entries are removed later.
+        """
+        Version = self.env["resource.booking.cache.version"]
+        for records in (types, combinations, resources, calendars):
+            if records:
+                Version._bump(records)
+
+    @api.model
+    def _invalidate_all(self):
+        """Make all cached slots obsolete."""
+        # All slots depend on the calendar of their booking type
+        self._invalidate(
+            calendars=self.env["resource.calendar"]
+            .with_context(active_test=False)
+            .search([])
+        )
+
+    @api.autovacuum
+    def _gc_outdated(self):
+        """Remove slots that belong to the past or were cached long ago."""
+        now = fields.Datetime.now()
+        self.sudo().search(
+            [
+                "|",
+                ("stop", "<", now),
+                ("create_date", "<", now - timedelta(days=1)),
+            ]
+        ).unlink()
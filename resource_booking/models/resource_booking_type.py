@@ -1,11 +1,21 @@
 # Copyright 2021 Tecnativa - Jairo Llopis
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
-from datetime import timedelta
-from math import ceil
+from datetime import datetime, time, timedelta
 from random import random
 
+from pytz import timezone
+
 from odoo import _, api, fields, models
+from odoo.tools.lru import LRU
+
+from odoo.addons.resource.models.resource import Intervals
+
+from ..metrics import measured
+
+# Slot grids of each booking type, shared by all requests of the process;
+# entries of old type or calendar versions are never hit again and get evicted
+_slot_grid_cache = LRU(1024)
 
 
 class ResourceBookingType(models.Model):
@@ -32,6 +42,7 @@ class ResourceBookingType(models.Model):
         [
             ("sorted", "Sorted: pick the first one that is free"),
             ("random", "Randomly: order is not important"),
+            ("least_used", "Least used: pick the one with fewer bookings around"),
         ],
         required=True,
         default="random",
@@ -118,49 +129,246 @@ class ResourceBookingType(models.Model):
         bookings = self.mapped("booking_ids")
         return bookings._check_scheduling()
 
-    def _get_combinations_priorized(self):
-        """Gets all combinations sorted by the chosen assignment method."""
+    def write(self, vals):
+        """Forget slots computed with old settings."""
+        result = super().write(vals)
+        if {"combination_rel_ids", "duration", "resource_calendar_id"}.intersection(
+            vals
+        ):
+            # Slot grids are cached by type version too
+            self.env["resource.booking.slot.cache"]._invalidate(types=self)
+        return result
+
+    def _get_combinations_priorized(self, day=None):
+        """Gets all combinations sorted by the chosen assignment method.
+
+        :param date day:
+            Day when the booking happens, used to know the least used
+            combinations. Defaults to today.
+        """
         if not self.combination_assignment:
             return self.combination_rel_ids.mapped("combination_id")
+        if self.combination_assignment == "least_used":
+            loads = self.combination_rel_ids.mapped(
+                "combination_id"
+            )._get_booking_loads(day or fields.Date.context_today(self))
+            rels = self.combination_rel_ids.sorted(
+                lambda rel: (loads[rel.combination_id.id], rel.sequence, rel.id)
+            )
+            return rels.mapped("combination_id")
         keys = {"sorted": "sequence", "random": lambda *a: random()}
         rels = self.combination_rel_ids.sorted(keys[self.combination_assignment])
         combinations = rels.mapped("combination_id")
         return combinations
 
-    def _get_next_slot_start(self, start_dt):
+    @measured(
+        lambda types: ", ".join(sorted(types.mapped("display_name"))),
+        lambda types, result: sum(
+            len(day_slots)
+            for type_slots in result.values()
+            for day_slots in type_slots.values()
+        ),
+    )
+    def _get_available_slots_batch(self, start_dt, end_dt):
+        """Get available slots for new bookings of each of these types.
+
+        All types share the work: each distinct calendar, resource and set of
+        busy meetings is computed only once, no matter how many types or
+        combinations use it.
+
+        :param datetime start_dt: Search slots from here (tz-aware).
+        :param datetime end_dt: Search slots until here (tz-aware).
+        :return dict:
+            Indexed by type ID, the available slots of that type, in the same
+            format returned by `resource.booking._get_available_slots()`.
+        """
+        now = fields.Datetime.context_timestamp(self, fields.Datetime.now())
+        # Detached compatibility with hr_holidays_public; no booking excluded
+        types = self.with_context(analyzing_booking=-1, exclude_public_holidays=True)
+        combination_intervals = types.mapped(
+            "combination_rel_ids.combination_id"
+        )._get_intervals_batch(start_dt, end_dt)
+        calendar_intervals = {
+            calendar: calendar._work_intervals_batch_cached(start_dt, end_dt)[False]
+            for calendar in types.mapped("resource_calendar_id")
+        }
+        result = {}
+        for one in types:
+            available_intervals = Intervals([])
+            for combination in one.combination_rel_ids.mapped("combination_id"):
+                available_intervals |= combination_intervals[combination.id]
+            available_intervals &= calendar_intervals[one.resource_calendar_id]
+            slots = one._get_fitting_slots(
+                available_intervals, start_dt, end_dt, timedelta(hours=one.duration)
+            )
+            earliest = now + timedelta(hours=one.modifications_deadline)
+            result[one.id] = type_slots = {}
+            for slot in slots:
+                if slot >= earliest:
+                    type_slots.setdefault(slot.date(), []).append(slot)
+        return result
+
+    def _get_slot_grid(self):
+        """Valid slot starts for each kind of day in the type calendar.
+
+        Slots start at the beginning of each (merged) block of work hours, and
+        then every `duration` hours, as long as one fits before the block ends.
+
+        Grids are cached by type and calendar versions, which change with
+        the type duration and the calendar attendances.
+
+        :return dict:
+            Slot start offsets from midnight (as `timedelta`), indexed by
+            `(dayofweek, week_type)`. Days with attendances limited in dates
+            can't be precomputed, and are indexed with `None` instead.
+        """
+        calendar = self.resource_calendar_id
+        Version = self.env["resource.booking.cache.version"]
+        key = (
+            self.env.cr.dbname,
+            self.id,
+            Version._get_versions(self)[self.id],
+            calendar.id,
+            Version._get_versions(calendar).get(calendar.id, 0),
+        )
+        grid = _slot_grid_cache.get(key)
+        if grid is None:
+            grid = _slot_grid_cache[key] = self._build_slot_grid()
+        return grid
+
+    def _build_slot_grid(self):
+        """Compute the slot grid returned by `_get_slot_grid()`."""
+        calendar = self.resource_calendar_id
+        attendances = calendar.attendance_ids.filtered(
+            lambda att: not att.display_type and not att.resource_id
+        )
+        week_types = ("0", "1") if calendar.two_weeks_calendar else (False,)
+        grid = {}
+        for dayofweek in range(7):
+            for week_type in week_types:
+                day_attendances = attendances.filtered(
+                    lambda att: int(att.dayofweek) == dayofweek
+                    and (not week_type or att.week_type == week_type)
+                )
+                if any(day_attendances.mapped("date_from")) or any(
+                    day_attendances.mapped("date_to")
+                ):
+                    grid[dayofweek, week_type] = None
+                else:
+                    grid[dayofweek, week_type] = self._get_slot_offsets(day_attendances)
+        return grid
+
+    def _get_slot_offsets(self, attendances):
+        """Slot start offsets from midnight for a day with these attendances."""
+        result = []
+        duration = timedelta(hours=self.duration)
+        blocks = []
+        for attendance in attendances.sorted("hour_from"):
+            if blocks and attendance.hour_from <= blocks[-1][1]:
+                blocks[-1][1] = max(blocks[-1][1], attendance.hour_to)
+            else:
+                blocks.append([attendance.hour_from, attendance.hour_to])
+        for hour_from, hour_to in blocks:
+            offset, block_end = (
+                timedelta(hours=hour_from),
+                timedelta(hours=hour_to),
+            )
+            while offset + duration <= block_end:
+                result.append(offset)
+                offset += duration
+        return tuple(result)
+
+    def _get_day_slot_offsets(self, day, grid=None):
+        """Slot start offsets from midnight for the given date.
+
+        :param dict grid: Result of `_get_slot_grid()`, if already known.
+        """
+        calendar = self.resource_calendar_id
+        week_type = calendar.two_weeks_calendar and str(
+            self.env["resource.calendar.attendance"].get_week_type(day)
+        )
+        grid = grid or self._get_slot_grid()
+        offsets = grid[day.weekday(), week_type]
+        if offsets is not None:
+            return offsets
+        # Uncommon case: attendances limited in dates
+        attendances = calendar.attendance_ids.filtered(
+            lambda att: not att.display_type
+            and not att.resource_id
+            and int(att.dayofweek) == day.weekday()
+            and (not week_type or att.week_type == week_type)
+            and (not att.date_from or att.date_from <= day)
+            and (not att.date_to or att.date_to >= day)
+        )
+        return self._get_slot_offsets(attendances)
+
+    def _get_next_slot_start(self, start_dt, grid=None):
         """Slot start as it would come from the beginning of work hours.
 
         Returns a `datetime` object indicating the next slot start (which could
         be the same as `start_dt` if it matches), or `False` if no slot is
         found in the next 2 weeks.
 
+        Slots are looked up in the grid precomputed from the type calendar
+        attendances. Leaves are ignored here: they are already discarded by
+        the availability intervals where slots must fit.
+
         If the RBT doesn't have a calendar, it returns `start_dt`, unaltered,
         because there's no way to know when a slot would start.
+
+        :param dict grid: Result of `_get_slot_grid()`, if already known.
         """
-        duration_delta = timedelta(hours=self.duration)
-        end_dt = start_dt + duration_delta
-        workday_min = start_dt.replace(hour=0, minute=0, second=0, microsecond=0)
-        # Detached compatibility with hr_holidays_public
-        res_calendar = self.resource_calendar_id.with_context(
-            exclude_public_holidays=True
-        )
-        attendance_intervals = res_calendar._attendance_intervals(workday_min, end_dt)
-        try:
-            workday_start, valid_end, _meta = attendance_intervals._items[-1]
-            if valid_end != end_dt:
-                # Inteval found, but without enough time; same as no interval
-                raise IndexError
-        except IndexError:
-            try:
-                # Returns `False` if no slot is found in the next 2 weeks
-                return (
-                    res_calendar.plan_hours(self.duration, end_dt, compute_leaves=True)
-                    - duration_delta
-                )
-            except TypeError:
-                return False
-        time_passed = valid_end - duration_delta - workday_start
-        return workday_start + duration_delta * ceil(time_passed / duration_delta)
+        if not self.resource_calendar_id:
+            return start_dt
+        tz = timezone(self.resource_calendar_id.tz or "UTC")
+        day = start_dt.astimezone(tz).date()
+        grid = grid or self._get_slot_grid()
+        for _days in range(15):
+            midnight = datetime.combine(day, time.min)
+            for offset in self._get_day_slot_offsets(day, grid):
+                slot_start = tz.localize(midnight + offset)
+                if slot_start >= start_dt:
+                    return slot_start.astimezone(start_dt.tzinfo)
+            day += timedelta(days=1)
+        return False
+
+    def _get_fitting_slots(
+        self, available_intervals, start_dt, end_dt, booking_duration
+    ):
+        """Get all slot starts where a booking fits in the available intervals.
+
+        It sweeps once over the sorted `available_intervals`, jumping directly
+        to the next interval when a slot doesn't fit in the current one.
+
+        :param Intervals available_intervals: Where bookings can happen.
+        :param datetime start_dt: Search slots from here.
+        :param datetime end_dt: Search slots until here.
+        :param timedelta booking_duration: Time that must fit after the slot start.
+        :return list: Slot start datetimes, sorted.
+        """
+        self.ensure_one()
+        result = []
+        slot_duration = timedelta(hours=self.duration)
+        grid = self.resource_calendar_id and self._get_slot_grid()
+        current = start_dt
+        for interval_start, interval_end, _meta in available_intervals:
+            if interval_start > current:
+                current = interval_start.astimezone(current.tzinfo)
+            while current < end_dt:
+                slot_start = self._get_next_slot_start(current, grid)
+                if not slot_start:
+                    return result
+                if current != slot_start:
+                    current = slot_start
+                    continue
+                # Not fitting here; next slots can only fit in next intervals
+                if current + booking_duration > interval_end:
+                    break
+                result.append(current)
+                current += slot_duration
+            if current >= end_dt:
+                break
+        return result
 
     def action_open_bookings(self):
         FloatTimeParser = self.env["ir.qweb.field.float_time"]
@@ -1,7 +1,7 @@
 # Copyright 2021 Tecnativa - Jairo Llopis
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
-from odoo import fields, models
+from odoo import api, fields, models
 
 
 class ResourceBookingCombinationRel(models.Model):
@@ -26,3 +26,28 @@ class ResourceBookingCombinationRel(models.Model):
         ondelete="cascade",
     )
     type_name = fields.Char(related="type_id.name")
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Forget slots computed without these combinations."""
+        result = super().create(vals_list)
+        result._invalidate_slot_cache()
+        return result
+
+    def write(self, vals):
+        """Forget slots computed with old combinations."""
+        self._invalidate_slot_cache()
+        result = super().write(vals)
+        self._invalidate_slot_cache()
+        return result
+
+    def unlink(self):
+        """Forget slots computed with these combinations."""
+        self._invalidate_slot_cache()
+        return super().unlink()
+
+    def _invalidate_slot_cache(self):
+        """Forget slots of affected types."""
+        self.env["resource.booking.slot.cache"]._invalidate(
+            types=self.mapped("type_id")
+        )
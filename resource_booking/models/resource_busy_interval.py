@@ -0,0 +1,174 @@
+# Copyright 2026 Tecnativa
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import api, fields, models
+from odoo.tools import split_every
+
+
+class ResourceBusyInterval(models.Model):
+    """Materialized busy time of resources, derived from calendar events.
+
+    There is one row for each resource that is busy because of an active
+    calendar event. Rows are refreshed each time a related event, attendee,
+    booking, combination or resource changes, so availability can be
+    computed with a single range lookup.
+    """
+
+    _name = "resource.busy.interval"
+    _description = "Resource busy interval"
+    _order = "start, id"
+    _log_access = False
+
+    resource_id = fields.Many2one(
+        comodel_name="resource.resource",
+        string="Resource",
+        index=True,
+        ondelete="cascade",
+        readonly=True,
+        required=True,
+    )
+    event_id = fields.Many2one(
+        comodel_name="calendar.event",
+        string="Meeting",
+        index=True,
+        ondelete="cascade",
+        readonly=True,
+        required=True,
+    )
+    booking_id = fields.Many2one(
+        comodel_name="resource.booking",
+        string="Booking",
+        index=True,
+        ondelete="cascade",
+        readonly=True,
+        help="Booking that owns the meeting, if any.",
+    )
+    start = fields.Datetime(readonly=True, required=True)
+    stop = fields.Datetime(readonly=True, required=True)
+
+    def init(self):
+        """Index that makes range lookups per resource cheap."""
+        self.env.cr.execute(
+            """
+            CREATE INDEX IF NOT EXISTS resource_busy_interval_range_index
+            ON resource_busy_interval (resource_id, start, stop)
+            """
+        )
+
+    @api.model
+    def _prepare_values(self, events):
+        """Get the rows that should exist for the given events."""
+        events = events.filtered("active")
+        # Persons can only be busy in events where they are invited
+        user_resources = (
+            self.env["resource.resource"]
+            .with_context(active_test=False)
+            .search(
+                [
+                    ("resource_type", "=", "user"),
+                    ("user_id.partner_id", "in", events.mapped("partner_ids").ids),
+                ]
+            )
+        )
+        vals_list = []
+        for event in events:
+            booking = event.resource_booking_ids[:1]
+            booked_resources = event.mapped(
+                "resource_booking_ids.combination_id.resource_ids"
+            )
+            busy_partners = event.attendee_ids.filtered(
+                lambda attendee: attendee.state != "declined"
+            ).mapped("partner_id")
+            invited_resources = user_resources.filtered(
+                lambda res: res.user_id.partner_id in event.partner_ids
+            )
+            for res in booked_resources | invited_resources:
+                resource_user = (
+                    res.resource_type == "user" and res.user_id.active and res.user_id
+                )
+                # Persons are only concerned by events where they are invited
+                if resource_user and resource_user.partner_id not in event.partner_ids:
+                    continue
+                # Is the event booking our resource?
+                busy = res in booked_resources
+                # Special cases when the booked resource is a person
+                if not busy and resource_user:
+                    busy = (
+                        # Is it a busy event belonging to the resource?
+                        (event.user_id == resource_user and event.show_as == "busy")
+                        # ... or is he invited to this event?
+                        or resource_user.partner_id in busy_partners
+                    )
+                if busy:
+                    vals_list.append(
+                        {
+                            "booking_id": booking.id,
+                            "event_id": event.id,
+                            "resource_id": res.id,
+                            "start": event.start,
+                            "stop": event.stop,
+                        }
+                    )
+        return vals_list
+
+    @api.model
+    def _refresh(self, events):
+        """Recompute rows for the given events.
+
+        Only rows that actually change are touched, so refreshing a long
+        series of recurrent meetings where only some occurrences changed is
+        cheap, and only the slots of affected resources are forgotten.
+
+        :return: Events whose rows changed.
+        """
+        self = self.sudo()
+        events = events.sudo().with_context(active_test=False).exists()
+        old = {
+            (row.event_id.id, row.resource_id.id): row
+            for row in self.search([("event_id", "in", events.ids)])
+        }
+        to_create = []
+        changed = self.browse()
+        for vals in self._prepare_values(events):
+            row = old.pop((vals["event_id"], vals["resource_id"]), None)
+            if row is None:
+                to_create.append(vals)
+            elif (row.booking_id.id, row.start, row.stop) != (
+                vals["booking_id"],
+                vals["start"],
+                vals["stop"],
+            ):
+                row.write(
+                    {
+                        "booking_id": vals["booking_id"],
+                        "start": vals["start"],
+                        "stop": vals["stop"],
+                    }
+                )
+                changed |= row
+        removed = self.browse([row.id for row in old.values()])
+        changed |= removed
+        changed_events = changed.mapped("event_id")
+        changed_resources = changed.mapped("resource_id")
+        removed.unlink()
+        created = self.create(to_create)
+        changed_events |= created.mapped("event_id")
+        changed_resources |= created.mapped("resource_id")
+        if changed_resources:
+            self.env["resource.booking.slot.cache"]._invalidate(
+                resources=changed_resources
+            )
+        if self.env.context.get("resource_booking_line_sync", True):
+            self.env["resource.booking.line"]._sync(
+                events.mapped("resource_booking_ids")
+            )
+        return changed_events
+
+    @api.model
+    def _rebuild(self):
+        """Recompute all rows from scratch."""
+        self = self.sudo().with_context(resource_booking_line_sync=False)
+        self.search([]).unlink()
+        events = self.env["calendar.event"].with_context(active_test=True).search([])
+        for event_ids in split_every(1000, events.ids):
+            self._refresh(events.browse(event_ids))
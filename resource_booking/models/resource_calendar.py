@@ -2,15 +2,22 @@
 # Copyright 2022 Tecnativa - Pedro M. Baeza
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
-from pytz import UTC
+from datetime import datetime, time, timedelta
 
-from odoo import api, fields, models
+from pytz import UTC, UnknownTimeZoneError, timezone
+
+from odoo import _, api, fields, models
+from odoo.exceptions import ValidationError
+from odoo.osv import expression
+from odoo.tools.lru import LRU
 
 from odoo.addons.resource.models.resource import Intervals
 
+from ..metrics import measured
 
-class Busy(Exception):
-    pass  # This is not a real exception, just a helper
+# Work intervals of each resource and day, shared by all requests of the
+# process; entries of old calendar versions are never hit again and get evicted
+_work_intervals_cache = LRU(16384)
 
 
 class ResourceCalendar(models.Model):
@@ -18,86 +25,350 @@ class ResourceCalendar(models.Model):
 
     @api.constrains("attendance_ids", "global_leave_ids", "leave_ids", "tz")
     def _check_bookings_scheduling(self):
-        """Scheduled bookings must have no conflicts."""
-        bookings = self.env["resource.booking"].search(
-            [
-                ("state", "=", "confirmed"),
-                ("stop", ">=", fields.Datetime.now()),
+        """Scheduled bookings must have no conflicts.
+
+        When availability before the change is known, only bookings happening
+        when availability changed are checked.
+        """
+        snapshots = dict(
+            self.env.context.get("resource_booking_calendar_snapshots", ())
+        )
+        changes = {}
+        calendar_domains = []
+        for calendar in self:
+            calendar_changes = calendar._get_availability_changes(
+                snapshots.get(calendar.id)
+            )
+            if calendar_changes == (set(), []):
+                continue
+            domain = [
                 "|",
-                ("combination_id.forced_calendar_id", "in", self.ids),
-                ("combination_id.resource_ids.calendar_id", "in", self.ids),
+                ("combination_id.forced_calendar_id", "=", calendar.id),
+                ("combination_id.resource_ids.calendar_id", "=", calendar.id),
             ]
+            # Only new leaves changed: search bookings that overlap them
+            if calendar_changes and not calendar_changes[0]:
+                domain = expression.AND(
+                    [
+                        domain,
+                        expression.OR(
+                            [
+                                [("start", "<", stop), ("stop", ">", start)]
+                                for start, stop in calendar_changes[1]
+                            ]
+                        ),
+                    ]
+                )
+            changes[calendar] = calendar_changes
+            calendar_domains.append(domain)
+        if not calendar_domains:
+            return
+        bookings = self.env["resource.booking"].search(
+            expression.AND(
+                [
+                    [
+                        ("state", "=", "confirmed"),
+                        ("stop", ">=", fields.Datetime.now()),
+                    ],
+                    expression.OR(calendar_domains),
+                ]
+            )
+        )
+        bookings = bookings.filtered(
+            lambda booking: any(
+                calendar._is_booking_affected(booking, calendar_changes)
+                for calendar, calendar_changes in changes.items()
+            )
         )
         return bookings._check_scheduling()
 
+    def _get_availability_snapshot(self):
+        """Get what defines when this calendar is available."""
+        self.ensure_one()
+        return (
+            self.tz,
+            self.two_weeks_calendar,
+            frozenset(
+                (
+                    att.dayofweek,
+                    att.week_type,
+                    att.hour_from,
+                    att.hour_to,
+                    att.date_from,
+                    att.date_to,
+                    att.resource_id.id,
+                )
+                for att in self.attendance_ids
+                if not att.display_type
+            ),
+            frozenset(
+                (leave.date_from, leave.date_to, leave.resource_id.id)
+                for leave in self.leave_ids
+            ),
+        )
+
+    def _get_availability_changes(self, snapshot):
+        """Know when availability changed since the snapshot was taken.
+
+        Only new leaves matter, because removing leaves can't produce conflicts.
+
+        :param tuple snapshot: Result of `_get_availability_snapshot()`.
+        :return tuple:
+            `(weekdays, windows)`, where `weekdays` is the set of days of week
+            whose attendances changed, and `windows` a list of `(start, stop)`
+            UTC naive datetimes covered by new leaves. `None` if everything
+            could have changed.
+        """
+        if not snapshot:
+            return None
+        old_tz, old_two_weeks, old_attendances, old_leaves = snapshot
+        tz, two_weeks, attendances, leaves = self._get_availability_snapshot()
+        if (old_tz, old_two_weeks) != (tz, two_weeks):
+            return None
+        weekdays = {int(att[0]) for att in old_attendances ^ attendances}
+        windows = [(leave[0], leave[1]) for leave in leaves - old_leaves]
+        return weekdays, windows
+
+    def _is_booking_affected(self, booking, changes):
+        """Know if availability changes of this calendar affect the booking.
+
+        :param tuple changes: Result of `_get_availability_changes()`.
+        """
+        combination = booking.combination_id
+        if self not in (
+            combination.forced_calendar_id
+            | combination.mapped("resource_ids.calendar_id")
+        ):
+            return False
+        if changes is None:
+            return True
+        weekdays, windows = changes
+        if any(
+            booking.start < stop and booking.stop > start for start, stop in windows
+        ):
+            return True
+        # Attendances apply in the timezone of each resource
+        for tz_name in {self.tz} | set(combination.mapped("resource_ids.tz")):
+            tz = timezone(tz_name or "UTC")
+            day, last_day = (
+                UTC.localize(dt).astimezone(tz).date()
+                for dt in (booking.start, booking.stop)
+            )
+            while day <= last_day:
+                if day.weekday() in weekdays:
+                    return True
+                day += timedelta(days=1)
+        return False
+
+    def _invalidate_work_intervals(self):
+        """Make cached work intervals of these calendars obsolete.
+
+        Slots cached with them become obsolete too, because they share versions.
+        """
+        self.env["resource.booking.cache.version"]._bump(self)
+
+    @api.model
+    def _get_public_holidays_version(self):
+        """Identify the current state of public holidays.
+
+        Detached compatibility with hr_holidays_public: its changes can't bump
+        calendar versions, so they are detected when building cache keys.
+
+        :return list: Amount and last change of public holidays, or `False`.
+        """
+        if "hr.holidays.public.line" not in self.env:
+            return False
+        self.env["hr.holidays.public"].flush(["write_date"])
+        self.env["hr.holidays.public.line"].flush(["write_date"])
+        self.env.cr.execute(
+            """
+            SELECT COUNT(*), MAX(write_date)::VARCHAR
+            FROM hr_holidays_public
+            UNION ALL
+            SELECT COUNT(*), MAX(write_date)::VARCHAR
+            FROM hr_holidays_public_line
+            """
+        )
+        return [value for row in self.env.cr.fetchall() for value in row]
+
+    def _work_intervals_batch_cached(self, start_dt, end_dt, resources=None):
+        """Like `_work_intervals_batch()`, but reusing known work intervals.
+
+        Work intervals only depend on attendances, leaves, public holidays and
+        timezones, so each resource and day is computed once per calendar and
+        public holidays version. Busy meetings change too often to be cached,
+        so they are subtracted later, if required by context.
+
+        :return dict: `Intervals` indexed by resource ID, or `False`.
+        """
+        self.ensure_one()
+        tz_name = getattr(start_dt.tzinfo, "zone", None)
+        if not tz_name:
+            return self._work_intervals_batch(start_dt, end_dt, resources)
+        tz = timezone(tz_name)
+        resources = resources or self.env["resource.resource"]
+        resources_list = list(resources) + [self.env["resource.resource"]]
+        key_base = (
+            self.env.cr.dbname,
+            self.id,
+            self.env["resource.booking.cache.version"]._get_versions(self)[self.id],
+            tz_name,
+            self.env.context.get("exclude_public_holidays")
+            and tuple(self._get_public_holidays_version() or ()),
+        )
+        days = []
+        day = start_dt.astimezone(tz).date()
+        while tz.localize(datetime.combine(day, time.min)) < end_dt:
+            days.append(day)
+            day += timedelta(days=1)
+        keys = {
+            (res.id, day): key_base + (res.id, res.tz, day)
+            for res in resources_list
+            for day in days
+        }
+        cached = {key: _work_intervals_cache.get(key) for key in keys.values()}
+        missing_days = sorted(
+            {day for (_id, day), key in keys.items() if cached[key] is None}
+        )
+        empty = self.env["resource.calendar.attendance"]
+        if missing_days:
+            fill_start, fill_end = (
+                tz.localize(datetime.combine(day, time.min))
+                for day in (missing_days[0], missing_days[-1] + timedelta(days=1))
+            )
+            computed = self.with_context(analyzing_booking=False)._work_intervals_batch(
+                fill_start, fill_end, resources
+            )
+            for day in missing_days:
+                day_start, day_end = (
+                    tz.localize(datetime.combine(one, time.min))
+                    for one in (day, day + timedelta(days=1))
+                )
+                day_interval = Intervals([(day_start, day_end, empty)])
+                for res in resources_list:
+                    key = keys[res.id, day]
+                    cached[key] = _work_intervals_cache[key] = tuple(
+                        (start, stop)
+                        for start, stop, _meta in computed[res.id] & day_interval
+                    )
+        window = Intervals([(start_dt, end_dt, empty)])
+        result = {
+            res.id: Intervals(
+                [
+                    (start, stop, empty)
+                    for day in days
+                    for start, stop in cached[keys[res.id, day]]
+                ]
+            )
+            & window
+            for res in resources_list
+        }
+        analyzing_booking = self.env.context.get("analyzing_booking")
+        if analyzing_booking and resources:
+            busy = self._calendar_event_busy_intervals_batch(
+                start_dt, end_dt, resources, analyzing_booking
+            )
+            for resource_id, intervals in busy.items():
+                result[resource_id] -= intervals
+        return result
+
+    def write(self, vals):
+        """Forget slots that used the old calendar."""
+        if {"attendance_ids", "global_leave_ids", "leave_ids", "tz"}.intersection(vals):
+            # Let constraints know what changed
+            self = self.with_context(
+                resource_booking_calendar_snapshots=tuple(
+                    (calendar.id, calendar._get_availability_snapshot())
+                    for calendar in self
+                )
+            )
+        result = super().write(vals)
+        if {
+            "attendance_ids",
+            "global_leave_ids",
+            "leave_ids",
+            "tz",
+            "two_weeks_calendar",
+        }.intersection(vals):
+            # Slot grids of booking types are cached by calendar version too
+            self.env["resource.booking.slot.cache"]._invalidate(calendars=self)
+        return result
+
+    @api.model
+    def _get_context_timezone(self, strict=False):
+        """Get the timezone used by `fields.Datetime.context_timestamp()`.
+
+        :param bool strict:
+            Raise a user error if the timezone is unknown, instead of falling
+            back to UTC.
+        """
+        tz_name = self.env.context.get("tz") or self.env.user.tz or "UTC"
+        try:
+            return timezone(tz_name)
+        except UnknownTimeZoneError:
+            if strict:
+                raise ValidationError(_("Unknown timezone: %s") % tz_name)
+            return UTC
+
     @api.model
+    @measured()
     def _calendar_event_busy_intervals(
         self, start_dt, end_dt, resource, analyzed_booking_id
     ):
         """Get busy meeting intervals."""
+        return self._calendar_event_busy_intervals_batch(
+            start_dt, end_dt, resource, analyzed_booking_id
+        ).get(resource.id, Intervals([]))
+
+    @api.model
+    @measured(items=lambda calendar, result: sum(map(len, result.values())))
+    def _calendar_event_busy_intervals_batch(
+        self, start_dt, end_dt, resources, analyzed_booking_id
+    ):
+        """Get busy meeting intervals for several resources at once.
+
+        :return dict: Busy `Intervals` indexed by resource ID.
+        """
         assert start_dt.tzinfo
         assert end_dt.tzinfo
-        start_dt, end_dt = (
-            fields.Datetime.to_string(dt.astimezone(UTC)) for dt in (start_dt, end_dt)
+        result = {res.id: [] for res in resources}
+        # We want to avoid unnecessary queries
+        if not resources:
+            return {}
+        # Busy intervals are materialized, so a single range lookup is enough;
+        # raw values come sorted, to convert them all in one pass
+        self.env["resource.busy.interval"].flush(
+            ["booking_id", "resource_id", "start", "stop"]
         )
-        intervals = []
-        resource_user = (
-            resource.resource_type == "user"
-            and resource.user_id.active
-            and resource.user_id
+        self.env.cr.execute(
+            """
+            SELECT resource_id, start, stop
+            FROM resource_busy_interval
+            WHERE resource_id IN %s
+                AND start <= %s
+                AND stop >= %s
+                -- Is the event the same one we're currently checking?
+                AND (booking_id IS NULL OR booking_id != %s)
+            ORDER BY start, stop
+            """,
+            (
+                tuple(resources.ids),
+                end_dt.astimezone(UTC).replace(tzinfo=None),
+                start_dt.astimezone(UTC).replace(tzinfo=None),
+                analyzed_booking_id,
+            ),
         )
-        # We want to avoid unnecessary queries, which can be quite unperformant when
-        # there are lots of recurrent events.
-        if not resource and not resource_user:
-            return Intervals(intervals)
-        # Simple domain to get all possibly conflicting events in a single
-        # query; this reduces DB calls and helps the underlying recurring
-        # system (in calendar.event) to work smoothly
-        domain = [("start", "<=", end_dt), ("stop", ">=", start_dt)]
-        # Anyway up to this version, is more performant to restrict as much as possible
-        # the events to avoid recurrent events.
-        # TODO: in v14 we should test which approach remains the most performant
-        if resource_user:
-            domain += [("partner_ids", "=", resource_user.partner_id.id)]
-        all_events = (
-            self.env["calendar.event"].with_context(active_test=True).search(domain)
-        )
-        for event in all_events:
-            # Is the event the same one we're currently checking?
-            if event.resource_booking_ids.id == analyzed_booking_id:
-                continue
-            try:
-                # Is the event not booking our resource?
-                if resource & event.mapped(
-                    "resource_booking_ids.combination_id.resource_ids"
-                ):
-                    raise Busy
-                # Special cases when the booked resource is a person
-                if resource_user:
-                    # Is it a busy event belonging to the resource?
-                    if event.user_id == resource_user and event.show_as == "busy":
-                        raise Busy
-                    # ... or is he invited to this event?
-                    for attendee in event.attendee_ids:
-                        if (
-                            attendee.partner_id == resource_user.partner_id
-                            and attendee.state != "declined"
-                        ):
-                            raise Busy
-            except Busy:
-                # Add the matched event as a busy interval
-                intervals.append(
-                    (
-                        fields.Datetime.context_timestamp(
-                            event, fields.Datetime.to_datetime(event.start)
-                        ),
-                        fields.Datetime.context_timestamp(
-                            event, fields.Datetime.to_datetime(event.stop)
-                        ),
-                        self.env["resource.calendar.leaves"],
-                    )
+        tz = self._get_context_timezone()
+        leaves = self.env["resource.calendar.leaves"]
+        for resource_id, start, stop in self.env.cr.fetchall():
+            result[resource_id].append(
+                (
+                    UTC.localize(start).astimezone(tz),
+                    UTC.localize(stop).astimezone(tz),
+                    leaves,
                 )
-        return Intervals(intervals)
+            )
+        return {res_id: Intervals(items) for res_id, items in result.items()}
 
     def _leave_intervals_batch(
         self, start_dt, end_dt, resources=None, domain=None, tz=None
@@ -105,12 +376,14 @@ class ResourceCalendar(models.Model):
         """Count busy meetings as leaves if required by context."""
         result = super()._leave_intervals_batch(start_dt, end_dt, resources, domain, tz)
         if self.env.context.get("analyzing_booking"):
-            for resource_id in result:
-                # TODO Make this work in batch too
-                result[resource_id] |= self._calendar_event_busy_intervals(
-                    start_dt,
-                    end_dt,
-                    self.env["resource.resource"].browse(resource_id),
-                    self.env.context["analyzing_booking"],
-                )
+            busy = self._calendar_event_busy_intervals_batch(
+                start_dt,
+                end_dt,
+                self.env["resource.resource"].browse(
+                    [res_id for res_id in result if res_id]
+                ),
+                self.env.context["analyzing_booking"],
+            )
+            for resource_id, intervals in busy.items():
+                result[resource_id] |= intervals
         return result
@@ -0,0 +1,37 @@
+# Copyright 2026 Tecnativa
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import api, models
+
+
+class ResourceCalendarAttendance(models.Model):
+    _inherit = "resource.calendar.attendance"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Forget slots computed without these attendances."""
+        result = super().create(vals_list)
+        result._invalidate_slot_cache()
+        return result
+
+    def write(self, vals):
+        """Forget slots computed with old attendances."""
+        old_calendars = self.mapped("calendar_id")
+        result = super().write(vals)
+        self._invalidate_slot_cache(old_calendars)
+        return result
+
+    def unlink(self):
+        """Forget slots computed with these attendances."""
+        self._invalidate_slot_cache()
+        return super().unlink()
+
+    def _invalidate_slot_cache(self, calendars=None):
+        """Forget slots, work intervals and slot grids of affected calendars.
+
+        :param calendars: Other calendars to invalidate too.
+        """
+        calendars = self.mapped("calendar_id") | (
+            calendars or self.env["resource.calendar"]
+        )
+        self.env["resource.booking.slot.cache"]._invalidate(calendars=calendars)
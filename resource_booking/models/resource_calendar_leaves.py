@@ -0,0 +1,38 @@
+# Copyright 2026 Tecnativa
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import api, models
+
+
+class ResourceCalendarLeaves(models.Model):
+    _inherit = "resource.calendar.leaves"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Forget slots computed without these leaves."""
+        result = super().create(vals_list)
+        result._invalidate_slot_cache()
+        return result
+
+    def write(self, vals):
+        """Forget slots computed with old leaves."""
+        self._invalidate_slot_cache()
+        result = super().write(vals)
+        self._invalidate_slot_cache()
+        return result
+
+    def unlink(self):
+        """Forget slots computed with these leaves."""
+        self._invalidate_slot_cache()
+        return super().unlink()
+
+    def _invalidate_slot_cache(self):
+        """Forget slots and work intervals of affected calendars and resources."""
+        SlotCache = self.env["resource.booking.slot.cache"]
+        # Leaves without calendar apply to all calendars
+        if any(not leave.calendar_id for leave in self):
+            return SlotCache._invalidate_all()
+        SlotCache._invalidate(
+            calendars=self.mapped("calendar_id"),
+            resources=self.mapped("resource_id"),
+        )
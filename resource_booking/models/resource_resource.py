@@ -12,10 +12,40 @@ class ResourceResource(models.Model):
     @api.constrains("calendar_id", "resource_type", "tz", "user_id")
     def _check_bookings_scheduling(self):
         """Scheduled bookings must have no conflicts."""
-        bookings = self.env["resource.booking"].search(
+        return self.env["resource.booking"]._check_scheduling_search(
             [("combination_id.resource_ids", "in", self.ids)]
         )
-        return bookings._check_scheduling()
+
+    def _invalidate_booking_busy(self):
+        """Make slots cached with the old availability of these resources obsolete."""
+        self.env["resource.booking.cache.version"]._bump(self)
+
+    def write(self, vals):
+        """Update busy intervals when resources change their kind."""
+        if {"calendar_id", "tz"}.intersection(vals):
+            self.env["resource.booking.slot.cache"]._invalidate(resources=self)
+        if not {"resource_type", "user_id"}.intersection(vals):
+            return super().write(vals)
+        partners = self.mapped("user_id.partner_id")
+        result = super().write(vals)
+        partners |= self.mapped("user_id.partner_id")
+        events = (
+            self.env["calendar.event"]
+            .with_context(active_test=False)
+            .search(
+                [
+                    "|",
+                    ("partner_ids", "in", partners.ids),
+                    (
+                        "resource_booking_ids.combination_id.resource_ids",
+                        "in",
+                        self.ids,
+                    ),
+                ]
+            )
+        )
+        events._refresh_busy_intervals()
+        return result
 
     def is_available(self, start_dt, end_dt, domain=None, tz=None):
         """Convenience method to check whether a resource is available within a
@@ -0,0 +1,104 @@
+/* Copyright 2026 Tecnativa
+ * License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl). */
+
+odoo.define("resource_booking.booking_schedule", function (require) {
+    "use strict";
+
+    const core = require("web.core");
+    const publicWidget = require("web.public.widget");
+
+    const qweb = core.qweb;
+
+    /**
+     * Load slots of the scheduling calendar weeks that the server left empty.
+     *
+     * The server only renders slots of the first week that can have them, to
+     * answer fast. Each remaining week is fetched from the slots JSON route.
+     */
+    publicWidget.registry.ResourceBookingSchedule = publicWidget.Widget.extend({
+        selector: ".o_booking_calendar[data-slots-url]",
+        xmlDependencies: ["/resource_booking/static/src/xml/booking_schedule.xml"],
+
+        /**
+         * @override
+         */
+        start: function () {
+            const weeks = this.$("tr[data-lazy-start]").toArray();
+            const loaded = weeks.map((week) => this._loadWeek(week));
+            Promise.all(loaded).then(() => {
+                if (!this.$(".slots-dropdown").length) {
+                    this.$(".o_booking_no_slots").removeClass("d-none");
+                }
+            });
+            return this._super.apply(this, arguments);
+        },
+
+        /**
+         * Fetch slots of a week and render them in its days.
+         *
+         * @private
+         * @param {HTMLElement} week Calendar row with the dates to load
+         * @returns {Promise}
+         */
+        _loadWeek: function (week) {
+            return this._rpc({
+                route: this.el.dataset.slotsUrl,
+                params: {
+                    access_token: this.el.dataset.accessToken,
+                    start: week.dataset.lazyStart,
+                    end: week.dataset.lazyEnd,
+                },
+            }).then((result) => {
+                for (const day of week.querySelectorAll("td[data-date]")) {
+                    const timestamps = result.slots[day.dataset.date];
+                    if (timestamps && timestamps.length) {
+                        this._renderDay(day, timestamps, result.tz);
+                    }
+                }
+            });
+        },
+
+        /**
+         * Render the slots dropdown of a day and its confirmation modals.
+         *
+         * @private
+         * @param {HTMLElement} day Calendar cell of the day
+         * @param {Number[]} timestamps Slot start epoch timestamps
+         * @param {String} tz Timezone used to display slots
+         */
+        _renderDay: function (day, timestamps, tz) {
+            const lang = document.documentElement.lang || undefined;
+            const hour12 = this.el.dataset.hour12 === "1";
+            const slots = timestamps.map((timestamp) => {
+                const when = new Date(timestamp * 1000);
+                return {
+                    id: Math.round(timestamp),
+                    when: when.toISOString(),
+                    date: when.toLocaleDateString(lang, {timeZone: tz}),
+                    time: when.toLocaleTimeString(lang, {
+                        timeZone: tz,
+                        hour: "2-digit",
+                        minute: "2-digit",
+                        hour12: hour12,
+                    }),
+                };
+            });
+            day.innerHTML = qweb.render("resource_booking.ScheduleDay", {
+                date: day.dataset.date,
+                day: Number(day.dataset.date.split("-")[2]),
+                slots: slots,
+            });
+            this.$el.append(
+                qweb.render("resource_booking.ScheduleConfirm", {
+                    access_token: this.el.dataset.accessToken,
+                    confirm_url: this.el.dataset.confirmUrl,
+                    csrf_token: this.el.dataset.csrfToken,
+                    duration: this.$(".o_booking_duration").text(),
+                    slots: slots,
+                })
+            );
+        },
+    });
+
+    return publicWidget.registry.ResourceBookingSchedule;
+});
@@ -1,6 +1,12 @@
 # Copyright 2021 Tecnativa - Jairo Llopis
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
+from datetime import datetime, timedelta
+from random import Random
+
+# Fields used to enable each weekday in recurrent calendar events
+WEEKDAY_FIELDS = ("mo", "tu", "we", "th", "fr", "sa", "su")
+
 
 def create_test_data(obj):
     """Create test data for a case."""
@@ -134,3 +140,138 @@ def create_test_data(obj):
     )
     # Create some partner
     obj.partner = obj.env["res.partner"].create({"name": "some customer"})
+
+
+def create_benchmark_data(
+    obj, resources=40, combinations=20, types=5, events=200, seed=0
+):
+    """Create a scalable data set to measure performance.
+
+    :param int resources:
+        Amount of resources. One every 4 is a person, the rest are material.
+    :param int combinations:
+        Amount of combinations, each one with 1 to 3 random resources.
+    :param int types:
+        Amount of booking types. Combinations are distributed among them.
+    :param int events:
+        Amount of calendar events, half of them weekly recurring for 4 weeks.
+        They happen on afternoons and involve people resources.
+    :param int seed: Seed for random choices, to make data reproducible.
+    """
+    rand = Random(seed)
+    obj.env = obj.env(
+        context=dict(
+            obj.env.context, tracking_disable=True, no_reset_password=True, tz="UTC"
+        )
+    )
+    obj.bm_calendar = obj.env["resource.calendar"].create(
+        {
+            "name": "Benchmark weekdays",
+            "tz": "UTC",
+            "attendance_ids": [
+                (
+                    0,
+                    0,
+                    {
+                        "name": "Weekday %d" % day,
+                        "dayofweek": str(day),
+                        "hour_from": 8,
+                        "hour_to": 17,
+                        "day_period": "morning",
+                    },
+                )
+                for day in range(5)
+            ],
+        }
+    )
+    people = resources // 4
+    obj.bm_users = obj.env["res.users"].create(
+        [
+            {
+                "email": "bm_user_%d@example.com" % num,
+                "login": "bm_user_%d" % num,
+                "name": "Benchmark user %d" % num,
+            }
+            for num in range(people)
+        ]
+    )
+    obj.bm_resources = obj.env["resource.resource"].create(
+        [
+            {
+                "calendar_id": obj.bm_calendar.id,
+                "name": "Benchmark user resource %d" % num,
+                "resource_type": "user",
+                "tz": "UTC",
+                "user_id": user.id,
+            }
+            for num, user in enumerate(obj.bm_users)
+        ]
+        + [
+            {
+                "calendar_id": obj.bm_calendar.id,
+                "name": "Benchmark material resource %d" % num,
+                "resource_type": "material",
+                "tz": "UTC",
+            }
+            for num in range(resources - people)
+        ]
+    )
+    obj.bm_rbcs = obj.env["resource.booking.combination"].create(
+        [
+            {
+                "resource_ids": [
+                    (
+                        6,
+                        0,
+                        rand.sample(
+                            obj.bm_resources.ids, min(rand.randint(1, 3), resources)
+                        ),
+                    )
+                ]
+            }
+            for _num in range(combinations)
+        ]
+    )
+    obj.bm_rbts = obj.env["resource.booking.type"].create(
+        [
+            {
+                "name": "Benchmark type %d" % num,
+                "combination_rel_ids": [
+                    (0, 0, {"sequence": seq, "combination_id": rbc.id})
+                    for seq, rbc in enumerate(obj.bm_rbcs[num % combinations :: types])
+                ],
+                "resource_calendar_id": obj.bm_calendar.id,
+            }
+            for num in range(types)
+        ]
+    )
+    first_monday = datetime(2021, 3, 1)
+    events_vals = []
+    for num in range(events):
+        start = first_monday + timedelta(
+            days=rand.randrange(28) // 7 * 7 + rand.randrange(5),
+            hours=rand.randint(13, 15),
+            minutes=rand.choice((0, 30)),
+        )
+        vals = {
+            "name": "Benchmark event %d" % num,
+            "start": start,
+            "stop": start + timedelta(hours=rand.choice((0.5, 1, 2))),
+            "partner_ids": [
+                (6, 0, rand.sample(obj.bm_users.partner_id.ids, min(2, people)))
+            ],
+        }
+        if num % 2:
+            vals.update(
+                {
+                    "recurrency": True,
+                    "rrule_type": "weekly",
+                    "interval": 1,
+                    "end_type": "count",
+                    "count": 4,
+                    WEEKDAY_FIELDS[start.weekday()]: True,
+                }
+            )
+        events_vals.append(vals)
+    obj.bm_events = obj.env["calendar.event"].create(events_vals)
+    obj.bm_partner = obj.env["res.partner"].create({"name": "Benchmark customer"})
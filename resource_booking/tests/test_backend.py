@@ -1,19 +1,24 @@
 # Copyright 2021 Tecnativa - Jairo Llopis
 # Copyright 2022 Tecnativa - Pedro M. Baeza
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
-from datetime import date, datetime
-from unittest.mock import patch
+from datetime import date, datetime, timedelta
+from unittest.mock import Mock, patch
 
 from freezegun import freeze_time
-from pytz import utc
+from psycopg2 import IntegrityError
+from pytz import timezone, utc
 
 from odoo import fields
 from odoo.exceptions import ValidationError
 from odoo.tests.common import Form, SavepointCase, new_test_user, users
+from odoo.tools import mute_logger
 
 from odoo.addons.resource.models.resource import Intervals
+from odoo.addons.resource_booking import metrics
 from odoo.addons.resource_booking.models.resource_booking import (
     _availability_is_fitting,
+    _normalize_intervals,
+    _normalized_is_fitting,
 )
 
 from .common import create_test_data
@@ -28,6 +33,13 @@ class BackendCase(SavepointCase):
         super().setUpClass()
         create_test_data(cls)
         cls.plain_user = new_test_user(cls.env, login="plain", groups="base.group_user")
+        cls.metrics_enabled = metrics.is_enabled()
+        metrics.set_enabled(True)
+
+    @classmethod
+    def tearDownClass(cls):
+        metrics.set_enabled(cls.metrics_enabled)
+        super().tearDownClass()
 
     @users("plain")
     def test_plain_user_calendar_event(self):
@@ -524,6 +536,142 @@ class BackendCase(SavepointCase):
         with self.assertRaises(ValidationError), self.env.cr.savepoint():
             future_booking.action_confirm()
 
+    def test_change_calendar_checks_affected_bookings(self):
+        """Calendar changes only check bookings happening when they apply."""
+        cal_mon = self.r_calendars[0]
+        bookings = self.env["resource.booking"].create(
+            [
+                {
+                    "combination_id": self.rbcs[0].id,
+                    "partner_id": self.partner.id,
+                    "start": start,
+                    "type_id": self.rbt.id,
+                }
+                for start in ("2021-03-01 08:00:00", "2021-03-08 08:00:00")
+            ]
+        )
+        bookings.action_confirm()
+
+        def checked_bookings():
+            return sum(
+                values["items"]
+                for (name, _subject), values in metrics.snapshot().items()
+                if name == "ResourceBooking._check_scheduling"
+            )
+
+        # A leave far away checks nothing
+        metrics.reset()
+        cal_mon.write(
+            {
+                "leave_ids": [
+                    (
+                        0,
+                        0,
+                        {
+                            "name": "Far away",
+                            "date_from": datetime(2021, 4, 5),
+                            "date_to": datetime(2021, 4, 6),
+                        },
+                    )
+                ]
+            }
+        )
+        self.assertEqual(checked_bookings(), 0)
+        # New attendances on other weekdays check nothing either
+        cal_mon.write(
+            {
+                "attendance_ids": [
+                    (
+                        0,
+                        0,
+                        {
+                            "name": "Thursdays",
+                            "dayofweek": "3",
+                            "hour_from": 8,
+                            "hour_to": 17,
+                        },
+                    )
+                ]
+            }
+        )
+        self.assertEqual(checked_bookings(), 0)
+        # A leave around the 2nd booking checks only that one
+        cal_mon.write(
+            {
+                "leave_ids": [
+                    (
+                        0,
+                        0,
+                        {
+                            "name": "Other resource is absent",
+                            "date_from": datetime(2021, 3, 8),
+                            "date_to": datetime(2021, 3, 9),
+                            "resource_id": self.r_users[1].id,
+                        },
+                    )
+                ]
+            }
+        )
+        self.assertEqual(checked_bookings(), 1)
+        # Changing Monday attendances checks both bookings
+        metrics.reset()
+        monday = cal_mon.attendance_ids.filtered(lambda att: att.dayofweek == "0")
+        cal_mon.write({"attendance_ids": [(1, monday.id, {"hour_to": 18})]})
+        self.assertEqual(checked_bookings(), 2)
+        with self.assertRaises(ValidationError), self.env.cr.savepoint():
+            cal_mon.write({"attendance_ids": [(1, monday.id, {"hour_from": 9})]})
+        # Timezone changes check everything
+        metrics.reset()
+        cal_mon.tz = "Africa/Abidjan"
+        self.assertEqual(checked_bookings(), 2)
+
+    def test_change_calendar_checks_resource_timezone(self):
+        """Attendance changes are checked in the timezone of resources."""
+        cal_mon = self.r_calendars[0]
+        self.rbt.resource_calendar_id = self.r_calendars[3]
+        self.rbcs[0].resource_ids.write({"tz": "Pacific/Kiritimati"})
+        # Sunday in UTC, but Monday at 10:00 for the resources
+        booking = self.env["resource.booking"].create(
+            {
+                "combination_id": self.rbcs[0].id,
+                "combination_auto_assign": False,
+                "partner_id": self.partner.id,
+                "start": "2021-02-28 20:00:00",
+                "type_id": self.rbt.id,
+            }
+        )
+        booking.action_confirm()
+        self.assertEqual(booking.state, "confirmed")
+        with self.assertRaises(ValidationError), self.env.cr.savepoint():
+            cal_mon.write(
+                {"attendance_ids": [(1, cal_mon.attendance_ids.id, {"hour_from": 11})]}
+            )
+
+    def test_change_resource_checks_future_bookings(self):
+        """Resource changes only check bookings that didn't happen yet."""
+        past, future, _pending = self.env["resource.booking"].create(
+            [
+                {
+                    "combination_id": self.rbcs[0].id,
+                    "partner_id": self.partner.id,
+                    "start": start,
+                    "type_id": self.rbt.id,
+                }
+                for start in ("2021-02-22 08:00:00", "2021-03-01 08:00:00", False)
+            ]
+        )
+        metrics.reset()
+        self.r_users[0].tz = "Africa/Abidjan"
+        self.assertEqual(
+            metrics.snapshot()[
+                "ResourceBooking._check_scheduling", self.rbt.display_name
+            ]["items"],
+            1,
+        )
+        # Bookings are still validated
+        with self.assertRaises(ValidationError), self.env.cr.savepoint():
+            self.r_users[0].calendar_id = self.r_calendars[1]
+
     def test_notification_tz(self):
         """Mail notification TZ is the same as resource.booking.type always."""
         # Configure RBT with Madrid calendar, but partner has other TZ
@@ -967,3 +1115,1060 @@ class BackendCase(SavepointCase):
             }
         )
         booking.combination_id = rbc_2
+
+    def test_calendar_event_busy_intervals_batch(self):
+        """Busy intervals of several resources are found at once."""
+        booking = self.env["resource.booking"].create(
+            {
+                "partner_id": self.partner.id,
+                "start": "2021-03-01 08:00:00",
+                "type_id": self.rbt.id,
+                "combination_id": self.rbcs[2].id,
+                "combination_auto_assign": False,
+            }
+        )
+        self.env["calendar.event"].create(
+            {
+                "start": datetime(2021, 3, 1, 10),
+                "stop": datetime(2021, 3, 1, 11),
+                "name": "some meeting",
+                "partner_ids": [(6, 0, self.users[:2].partner_id.ids)],
+            }
+        )
+        resources = self.r_materials | self.r_users
+        start_dt = utc.localize(datetime(2021, 3, 1))
+        end_dt = utc.localize(datetime(2021, 3, 2))
+        calendar = self.env["resource.calendar"]
+        batch = calendar._calendar_event_busy_intervals_batch(
+            start_dt, end_dt, resources, -1
+        )
+        booked = [
+            (
+                utc.localize(datetime(2021, 3, 1, 8)),
+                utc.localize(datetime(2021, 3, 1, 8, 30)),
+            )
+        ]
+        invited = [
+            (
+                utc.localize(datetime(2021, 3, 1, 10)),
+                utc.localize(datetime(2021, 3, 1, 11)),
+            )
+        ]
+        # Material and human resources of the booked combination are busy, and
+        # so are invited people, but not material resources
+        expected = dict.fromkeys(resources.ids, [])
+        expected.update(
+            {
+                self.r_materials[2].id: booked,
+                self.r_users[2].id: booked,
+                self.r_users[0].id: invited,
+                self.r_users[1].id: invited,
+            }
+        )
+        self.assertEqual(
+            {
+                resource_id: [(start, stop) for start, stop, _meta in intervals]
+                for resource_id, intervals in batch.items()
+            },
+            expected,
+        )
+        # Single resource lookups go through the same path
+        self.assertEqual(
+            [
+                (start, stop)
+                for start, stop, _meta in calendar._calendar_event_busy_intervals(
+                    start_dt, end_dt, self.r_users[0], -1
+                )
+            ],
+            invited,
+        )
+        # The analyzed booking doesn't make its resources busy
+        self.assertFalse(
+            calendar._calendar_event_busy_intervals_batch(
+                start_dt, end_dt, self.r_materials[2], booking.id
+            )[self.r_materials[2].id]
+        )
+
+    def test_busy_intervals_materialized(self):
+        """Busy intervals follow meetings, attendees and combinations."""
+        BusyInterval = self.env["resource.busy.interval"]
+        rb = self.env["resource.booking"].create(
+            {
+                "partner_id": self.partner.id,
+                "start": "2021-03-01 08:00:00",
+                "type_id": self.rbt.id,
+                "combination_id": self.rbcs[0].id,
+                "combination_auto_assign": False,
+            }
+        )
+        busy = BusyInterval.search([("event_id", "=", rb.meeting_id.id)])
+        self.assertEqual(busy.resource_id, self.rbcs[0].resource_ids)
+        self.assertEqual(busy.booking_id, rb)
+        self.assertEqual(set(busy.mapped("start")), {rb.start})
+        self.assertEqual(set(busy.mapped("stop")), {rb.stop})
+        # Changing combination moves busy intervals to the new resources
+        rb.combination_id = self.rbcs[2]
+        busy = BusyInterval.search([("event_id", "=", rb.meeting_id.id)])
+        self.assertLessEqual(self.rbcs[2].resource_ids, busy.resource_id)
+        self.assertNotIn(self.r_materials[0], busy.resource_id)
+        # Attendees are busy unless they decline
+        event = self.env["calendar.event"].create(
+            {
+                "start": datetime(2021, 3, 1, 10),
+                "stop": datetime(2021, 3, 1, 11),
+                "name": "some meeting",
+                "partner_ids": [(6, 0, self.users[1].partner_id.ids)],
+            }
+        )
+        busy = BusyInterval.search([("event_id", "=", event.id)])
+        self.assertEqual(busy.resource_id, self.r_users[1])
+        event.attendee_ids.do_decline()
+        self.assertFalse(BusyInterval.search([("event_id", "=", event.id)]))
+        # Removing meetings removes busy intervals
+        rb.action_unschedule()
+        self.assertFalse(BusyInterval.search([("booking_id", "=", rb.id)]))
+
+    def test_available_slots_cache(self):
+        """Available slots are cached until something relevant changes."""
+        SlotCache = self.env["resource.booking.slot.cache"]
+        self.rbt.combination_rel_ids[1:].unlink()
+        rb = self.env["resource.booking"].create(
+            {"partner_id": self.partner.id, "type_id": self.rbt.id}
+        )
+        start_dt = utc.localize(datetime(2021, 3, 1))
+        end_dt = utc.localize(datetime(2021, 3, 2))
+        combinations = self.rbt.combination_rel_ids.mapped("combination_id")
+        slots = rb._get_available_slots(start_dt, end_dt)
+        self.assertEqual(len(slots[date(2021, 3, 1)]), 18)
+        self.assertEqual(SlotCache.search_count([("type_id", "=", self.rbt.id)]), 1)
+        # Cached slots are the same
+        with patch.object(
+            type(rb), "_compute_available_slots", side_effect=AssertionError
+        ):
+            self.assertEqual(rb._get_available_slots(start_dt, end_dt), slots)
+        # Booking a slot invalidates the cache for its resources
+        self.env["resource.booking"].create(
+            {
+                "partner_id": self.partner.id,
+                "start": "2021-03-01 08:00:00",
+                "type_id": self.rbt.id,
+            }
+        )
+        self.assertIsNone(SlotCache._get_slots(rb, combinations, start_dt, end_dt))
+        slots = rb._get_available_slots(start_dt, end_dt)
+        self.assertEqual(len(slots[date(2021, 3, 1)]), 17)
+        self.assertNotIn(utc.localize(datetime(2021, 3, 1, 8)), slots[date(2021, 3, 1)])
+        # Changing the type duration invalidates the cache too
+        self.rbt.duration = 1
+        self.assertIsNone(SlotCache._get_slots(rb, combinations, start_dt, end_dt))
+
+    def test_available_slots_cache_timezone(self):
+        """Cached slots are returned like computed ones, in any timezone."""
+        self.rbt.combination_rel_ids[1:].unlink()
+        rb = (
+            self.env["resource.booking"]
+            .create({"partner_id": self.partner.id, "type_id": self.rbt.id})
+            .with_context(tz="Asia/Tokyo")
+        )
+        tokyo = timezone("Asia/Tokyo")
+        start_dt = tokyo.localize(datetime(2021, 3, 1))
+        end_dt = tokyo.localize(datetime(2021, 3, 3))
+        cold = rb._get_available_slots(start_dt, end_dt)
+        with patch.object(
+            type(rb), "_compute_available_slots", side_effect=AssertionError
+        ):
+            warm = rb._get_available_slots(start_dt, end_dt)
+        self.assertEqual(warm, cold)
+        # Monday 08:00-17:00 UTC spans Monday and Tuesday in Tokyo
+        self.assertEqual(set(warm), {date(2021, 3, 1), date(2021, 3, 2)})
+        self.assertEqual(
+            {slot.tzinfo.zone for day_slots in warm.values() for slot in day_slots},
+            {"Asia/Tokyo"},
+        )
+
+    def test_available_slots_cache_versions(self):
+        """Slots cached before an invalidation are never hit after it."""
+        SlotCache = self.env["resource.booking.slot.cache"]
+        rb = self.env["resource.booking"].create(
+            {"partner_id": self.partner.id, "type_id": self.rbt.id}
+        )
+        combinations = self.rbt.combination_rel_ids.mapped("combination_id")
+        start_dt = utc.localize(datetime(2021, 3, 1))
+        end_dt = utc.localize(datetime(2021, 3, 2))
+        old_key = SlotCache._get_key(rb, combinations, start_dt, end_dt)
+        # A concurrent transaction changes resource availability
+        SlotCache._invalidate(resources=self.r_users[0])
+        self.assertNotEqual(
+            SlotCache._get_key(rb, combinations, start_dt, end_dt), old_key
+        )
+        old_key = SlotCache._get_key(rb, combinations, start_dt, end_dt)
+        SlotCache._invalidate(calendars=self.r_calendars[0])
+        self.assertNotEqual(
+            SlotCache._get_key(rb, combinations, start_dt, end_dt), old_key
+        )
+        # Type changes are versioned too
+        old_key = SlotCache._get_key(rb, combinations, start_dt, end_dt)
+        self.rbt.duration = 1
+        self.assertNotEqual(
+            SlotCache._get_key(rb, combinations, start_dt, end_dt), old_key
+        )
+        # Versions are appended, and only the current ones are kept
+        Version = self.env["resource.booking.cache.version"]
+        Version._bump(self.r_users[0])
+        current = Version._get_versions(self.r_users[0])
+        Version._gc_superseded()
+        self.assertEqual(
+            Version.search_count(
+                [
+                    ("res_model", "=", "resource.resource"),
+                    ("res_id", "=", self.r_users[0].id),
+                ]
+            ),
+            1,
+        )
+        self.assertEqual(Version._get_versions(self.r_users[0]), current)
+
+    def test_free_slots_around_busy_meeting(self):
+        """Slots after a busy meeting are aligned to the type slot grid."""
+        self.rbt.combination_rel_ids[1:].unlink()
+        self.env["calendar.event"].create(
+            {
+                "start": datetime(2021, 3, 1, 10),
+                "stop": datetime(2021, 3, 1, 10, 45),
+                "name": "some meeting",
+                "partner_ids": [(6, 0, self.users[0].partner_id.ids)],
+            }
+        )
+        rb = self.env["resource.booking"].create(
+            {"partner_id": self.partner.id, "type_id": self.rbt.id, "duration": 1}
+        )
+        slots = rb._get_available_slots(
+            utc.localize(datetime(2021, 3, 1)), utc.localize(datetime(2021, 3, 2))
+        )
+        expected = [
+            utc.localize(datetime(2021, 3, 1, 8)),
+            utc.localize(datetime(2021, 3, 1, 8, 30)),
+            utc.localize(datetime(2021, 3, 1, 9)),
+        ] + [
+            utc.localize(datetime(2021, 3, 1, hour, minute))
+            for hour in range(11, 17)
+            for minute in (0, 30)
+            if (hour, minute) != (16, 30)
+        ]
+        self.assertEqual(slots, {date(2021, 3, 1): expected})
+
+    def test_check_scheduling_batch(self):
+        """Bookings are validated together, but each one on its own."""
+        rbc_montue = self.rbcs[2]
+        bookings = self.env["resource.booking"].create(
+            [
+                {
+                    "partner_id": self.partner.id,
+                    "start": start,
+                    "type_id": self.rbt.id,
+                    "combination_id": rbc_montue.id,
+                    "combination_auto_assign": False,
+                }
+                for start in (
+                    "2021-03-01 08:00:00",
+                    "2021-03-02 08:00:00",
+                    "2021-03-08 08:00:00",
+                )
+            ]
+        )
+        self.assertEqual(bookings.mapped("state"), ["scheduled"] * 3)
+        # Each booking is not colliding with itself
+        self.assertFalse(bookings._get_unfitting_bookings())
+        bookings._check_scheduling()
+        # Intervals are computed only once for all bookings
+        with patch.object(
+            type(bookings),
+            "_get_intervals",
+            autospec=True,
+            side_effect=type(bookings)._get_intervals,
+        ) as get_intervals:
+            bookings._check_scheduling()
+        self.assertEqual(get_intervals.call_count, 1)
+        # A meeting on one of them makes only that one unfitting
+        self.env["calendar.event"].create(
+            {
+                "start": datetime(2021, 3, 2, 8),
+                "stop": datetime(2021, 3, 2, 9),
+                "name": "some meeting",
+                "partner_ids": [(6, 0, self.users[2].partner_id.ids)],
+            }
+        )
+        self.assertEqual(bookings._get_unfitting_bookings(), bookings[1])
+        with self.assertRaises(ValidationError):
+            bookings._check_scheduling()
+
+    def test_best_combination_shared_work(self):
+        """Candidate combinations share calendar computations."""
+        self.rbt.combination_assignment = "sorted"
+        rb = self.env["resource.booking"].new(
+            {
+                "partner_id": self.partner.id,
+                "start": datetime(2021, 3, 2, 8),
+                "type_id": self.rbt.id,
+            }
+        )
+        # Tuesday combination is the 1st one available
+        self.assertEqual(rb.combination_id, self.rbcs[1])
+        # Forget work intervals cached while computing the combination
+        self.r_calendars._invalidate_work_intervals()
+        calendar_cls = type(self.env["resource.calendar"])
+        with patch.object(
+            calendar_cls,
+            "_work_intervals_batch",
+            autospec=True,
+            side_effect=calendar_cls._work_intervals_batch,
+        ) as work_intervals_batch:
+            combination = rb._get_best_combination()
+        self.assertEqual(combination, self.rbcs[1])
+        # One call for the type calendar, and one for each resource calendar
+        self.assertEqual(work_intervals_batch.call_count, 5)
+
+    def test_work_intervals_cache(self):
+        """Work intervals are reused until their calendar changes."""
+        cal_mon = self.r_calendars[0]
+        resource = self.r_users[0]
+        start = utc.localize(datetime(2021, 3, 1, 10))
+        end = utc.localize(datetime(2021, 3, 9))
+        calendar_cls = type(self.env["resource.calendar"])
+
+        def work_intervals():
+            with patch.object(
+                calendar_cls,
+                "_work_intervals_batch",
+                autospec=True,
+                side_effect=calendar_cls._work_intervals_batch,
+            ) as work_intervals_batch:
+                result = cal_mon._work_intervals_batch_cached(start, end, resource)
+            return (
+                [(one[0], one[1]) for one in result[resource.id]],
+                work_intervals_batch.call_count,
+            )
+
+        expected = [
+            (start, utc.localize(datetime(2021, 3, 1, 17))),
+            (
+                utc.localize(datetime(2021, 3, 8, 8)),
+                utc.localize(datetime(2021, 3, 8, 17)),
+            ),
+        ]
+        self.assertEqual(work_intervals(), (expected, 1))
+        self.assertEqual(work_intervals(), (expected, 0))
+        # Cached results match uncached ones
+        self.assertEqual(
+            [
+                (one[0], one[1])
+                for one in cal_mon._work_intervals_batch(start, end, resource)[
+                    resource.id
+                ]
+            ],
+            expected,
+        )
+        # Busy meetings are excluded when analyzing bookings, but not cached
+        self.env["resource.booking"].create(
+            {
+                "combination_id": self.rbcs[0].id,
+                "combination_auto_assign": False,
+                "partner_id": self.partner.id,
+                "start": "2021-03-08 08:00:00",
+                "type_id": self.rbt.id,
+            }
+        )
+        result = cal_mon.with_context(
+            analyzing_booking=-1
+        )._work_intervals_batch_cached(start, end, resource)
+        self.assertEqual(
+            [(one[0], one[1]) for one in result[resource.id]][1:],
+            [
+                (
+                    utc.localize(datetime(2021, 3, 8, 8, 30)),
+                    utc.localize(datetime(2021, 3, 8, 17)),
+                )
+            ],
+        )
+        self.assertEqual(work_intervals(), (expected, 0))
+        # Changing attendances invalidates cached intervals
+        cal_mon.attendance_ids.write({"hour_to": 12})
+        intervals, calls = work_intervals()
+        self.assertEqual(calls, 1)
+        self.assertEqual(intervals[-1][1], utc.localize(datetime(2021, 3, 8, 12)))
+        # Leaves without calendar invalidate all calendars
+        self.env["resource.calendar.leaves"].create(
+            {
+                "name": "Holiday",
+                "date_from": datetime(2021, 3, 8),
+                "date_to": datetime(2021, 3, 9),
+            }
+        )
+        self.assertEqual(
+            work_intervals(), ([(start, utc.localize(datetime(2021, 3, 1, 12)))], 1)
+        )
+
+    def test_busy_intervals_timezone(self):
+        """Busy meetings are converted to the context timezone, sorted."""
+        bookings = self.env["resource.booking"].create(
+            [
+                {
+                    "combination_id": self.rbcs[0].id,
+                    "combination_auto_assign": False,
+                    "partner_id": self.partner.id,
+                    "start": start,
+                    "type_id": self.rbt.id,
+                }
+                for start in ("2021-03-01 10:00:00", "2021-03-01 08:00:00")
+            ]
+        )
+        madrid = timezone("Europe/Madrid")
+        resource = self.r_users[0]
+        busy = (
+            self.env["resource.calendar"]
+            .with_context(tz="Europe/Madrid")
+            ._calendar_event_busy_intervals_batch(
+                utc.localize(datetime(2021, 3, 1)),
+                utc.localize(datetime(2021, 3, 2)),
+                resource,
+                bookings[0].id,
+            )
+        )
+        self.assertEqual(
+            [(one[0], one[1]) for one in busy[resource.id]],
+            [
+                (
+                    madrid.localize(datetime(2021, 3, 1, 9)),
+                    madrid.localize(datetime(2021, 3, 1, 9, 30)),
+                )
+            ],
+        )
+        self.assertEqual(next(iter(busy[resource.id]))[0].tzinfo.zone, "Europe/Madrid")
+        # Without excluding any booking, all are busy, sorted
+        busy = self.env["resource.calendar"]._calendar_event_busy_intervals_batch(
+            utc.localize(datetime(2021, 3, 1)),
+            utc.localize(datetime(2021, 3, 2)),
+            resource,
+            -1,
+        )
+        self.assertEqual(
+            [one[0] for one in busy[resource.id]],
+            [utc.localize(datetime(2021, 3, 1, hour)) for hour in (8, 10)],
+        )
+
+    def test_normalized_intervals(self):
+        """Day-split intervals are merged, and fitting uses them."""
+        recset = self.env["resource.booking"]
+        available_intervals = Intervals(
+            [
+                (datetime(2021, 3, 1, 8, 0), datetime(2021, 3, 1, 12, 0), recset),
+                (datetime(2021, 3, 1, 18, 0), datetime(2021, 3, 1, 23, 59), recset),
+                (datetime(2021, 3, 2, 0, 0), datetime(2021, 3, 2, 18, 0), recset),
+            ]
+        )
+        normalized = _normalize_intervals(available_intervals)
+        self.assertEqual(
+            normalized,
+            [
+                (datetime(2021, 3, 1, 8, 0), datetime(2021, 3, 1, 12, 0)),
+                (datetime(2021, 3, 1, 18, 0), datetime(2021, 3, 2, 18, 0)),
+            ],
+        )
+        for start, end, expected in (
+            (datetime(2021, 3, 1, 8, 0), datetime(2021, 3, 1, 12, 0), True),
+            (datetime(2021, 3, 1, 9, 0), datetime(2021, 3, 1, 10, 0), True),
+            (datetime(2021, 3, 1, 7, 0), datetime(2021, 3, 1, 9, 0), False),
+            (datetime(2021, 3, 1, 11, 0), datetime(2021, 3, 1, 19, 0), False),
+            (datetime(2021, 3, 1, 18, 0), datetime(2021, 3, 2, 18, 0), True),
+            (datetime(2021, 3, 1, 23, 0), datetime(2021, 3, 2, 1, 0), True),
+            (datetime(2021, 3, 2, 17, 0), datetime(2021, 3, 2, 19, 0), False),
+        ):
+            self.assertEqual(_normalized_is_fitting(normalized, start, end), expected)
+
+    def test_free_slots_dont_span_two_days(self):
+        """Slots are only offered where bookings fit in one day's interval."""
+        self.rbt.resource_calendar_id = self.r_calendars[3]
+        rb = self.env["resource.booking"].create(
+            {
+                "partner_id": self.partner.id,
+                "type_id": self.rbt.id,
+                "duration": 2,
+            }
+        )
+        slots = rb._get_available_slots(
+            utc.localize(datetime(2021, 3, 6, 22)),
+            utc.localize(datetime(2021, 3, 7, 2)),
+        )
+        self.assertEqual(
+            slots, {date(2021, 3, 7): [utc.localize(datetime(2021, 3, 7))]}
+        )
+
+    def test_next_available_slots(self):
+        """First available slots are found scanning forward."""
+        rb = self.env["resource.booking"].create(
+            {"partner_id": self.partner.id, "type_id": self.rbt.id}
+        )
+        now = utc.localize(datetime(2021, 2, 26, 9))
+        month = rb._get_available_slots(now, now + timedelta(days=31))
+        expected = [slot for day_slots in month.values() for slot in day_slots]
+        # Results match the ones found in the whole month, across windows
+        self.assertEqual(rb._get_next_available_slots(now, 3), expected[:3])
+        self.assertEqual(rb._get_next_available_slots(now, 40), expected[:40])
+        self.assertEqual(expected[0], utc.localize(datetime(2021, 3, 1, 8)))
+        # Modifications deadline is respected
+        self.rbt.modifications_deadline = 94.5
+        self.assertEqual(
+            rb._get_next_available_slots(now),
+            [utc.localize(datetime(2021, 3, 2, 8))],
+        )
+        # Far slots are found too
+        self.assertEqual(
+            rb._get_next_available_slots(utc.localize(datetime(2021, 3, 2, 17))),
+            [utc.localize(datetime(2021, 3, 8, 8))],
+        )
+        self.assertFalse(
+            rb._get_next_available_slots(
+                utc.localize(datetime(2021, 3, 2, 17)), max_days=5
+            )
+        )
+
+    def test_available_slots_batch(self):
+        """Slots of several types are computed together, with the same results."""
+        rbt2 = self.rbt.copy(
+            {"duration": 1, "resource_calendar_id": self.r_calendars[0].id}
+        )
+        types = self.rbt + rbt2
+        start = utc.localize(datetime(2021, 3, 1))
+        end = utc.localize(datetime(2021, 3, 8))
+        # Some resource is busy
+        self.env["resource.booking"].create(
+            {
+                "partner_id": self.partner.id,
+                "start": "2021-03-01 10:00:00",
+                "type_id": self.rbt.id,
+                "combination_id": self.rbcs[0].id,
+                "combination_auto_assign": False,
+            }
+        )
+        result = types._get_available_slots_batch(start, end)
+        self.assertEqual(set(result), set(types.ids))
+        for rbt in types:
+            booking = self.env["resource.booking"].new(
+                {"partner_id": self.partner.id, "type_id": rbt.id}
+            )
+            self.assertEqual(result[rbt.id], booking._get_available_slots(start, end))
+        self.assertEqual(
+            result[rbt2.id][date(2021, 3, 1)][:3],
+            [utc.localize(datetime(2021, 3, 1, hour)) for hour in (8, 9, 10)],
+        )
+        self.assertNotIn(date(2021, 3, 2), result[rbt2.id])
+        self.assertIn(date(2021, 3, 2), result[self.rbt.id])
+
+    def test_next_slot_start_grid(self):
+        """Next slot start comes from the type calendar slot grid."""
+        self.rbt.duration = 1.5
+        for start, expected in (
+            (datetime(2021, 3, 1, 8), datetime(2021, 3, 1, 8)),
+            (datetime(2021, 3, 1, 9), datetime(2021, 3, 1, 9, 30)),
+            (datetime(2021, 3, 1, 15, 31), datetime(2021, 3, 2, 8)),
+            (datetime(2021, 3, 3, 10), datetime(2021, 3, 8, 8)),
+        ):
+            self.assertEqual(
+                self.rbt._get_next_slot_start(utc.localize(start)),
+                utc.localize(expected),
+            )
+        # Slots are relative to the start of work hours in the calendar tz
+        self.assertEqual(
+            self.rbt._get_next_slot_start(
+                timezone("Europe/Madrid").localize(datetime(2021, 3, 1, 9, 15))
+            ),
+            timezone("Europe/Madrid").localize(datetime(2021, 3, 1, 10, 30)),
+        )
+        # Grid is rebuilt when attendances or duration change, without
+        # clearing caches of the whole registry
+        with patch.object(type(self.registry), "clear_caches") as clear_caches:
+            self.r_calendars[2].attendance_ids[0].hour_from = 9
+            self.assertEqual(
+                self.rbt._get_next_slot_start(utc.localize(datetime(2021, 3, 1, 8))),
+                utc.localize(datetime(2021, 3, 1, 9)),
+            )
+            self.rbt.duration = 1
+            self.assertEqual(
+                self.rbt._get_next_slot_start(
+                    utc.localize(datetime(2021, 3, 1, 10, 1))
+                ),
+                utc.localize(datetime(2021, 3, 1, 11)),
+            )
+        clear_caches.assert_not_called()
+        # Attendances limited in dates are respected
+        self.r_calendars[2].attendance_ids[0].date_to = date(2021, 3, 1)
+        self.assertEqual(
+            self.rbt._get_next_slot_start(utc.localize(datetime(2021, 3, 7))),
+            utc.localize(datetime(2021, 3, 9, 8)),
+        )
+        # No slots at all
+        self.r_calendars[2].attendance_ids.unlink()
+        self.assertFalse(
+            self.rbt._get_next_slot_start(utc.localize(datetime(2021, 3, 1, 8)))
+        )
+
+    def test_metrics(self):
+        """Availability hot paths are measured per booking type."""
+        metrics.reset()
+        rb = self.env["resource.booking"].create(
+            {"partner_id": self.partner.id, "type_id": self.rbt.id}
+        )
+        slots = rb._get_available_slots(
+            utc.localize(datetime(2021, 3, 1)), utc.localize(datetime(2021, 3, 2))
+        )
+        snapshot = metrics.snapshot()
+        entry = snapshot["ResourceBooking._get_available_slots", self.rbt.display_name]
+        self.assertEqual(entry["calls"], 1)
+        self.assertEqual(entry["items"], len(slots[date(2021, 3, 1)]))
+        self.assertGreater(entry["queries"], 0)
+        self.assertGreater(entry["seconds"], 0)
+        self.assertIn(
+            ("ResourceBooking._get_intervals", self.rbt.display_name), snapshot
+        )
+        # Calls that fail are counted too
+        metrics.reset()
+        self.rbt.resource_calendar_id = self.r_calendars[0]
+        with self.assertRaises(ValidationError), self.env.cr.savepoint():
+            self.env["resource.booking"].create(
+                {
+                    "partner_id": self.partner.id,
+                    "start": "2021-03-02 08:00:00",
+                    "type_id": self.rbt.id,
+                    "combination_id": self.rbcs[2].id,
+                    "combination_auto_assign": False,
+                }
+            )
+        entry = metrics.snapshot()[
+            "ResourceBooking._check_scheduling", self.rbt.display_name
+        ]
+        # Each booking counts as an item, except in the failed call
+        self.assertGreater(entry["calls"], entry["items"])
+        snapshot = metrics.snapshot()
+        # Metrics can be displayed in the backend
+        action = self.env["resource.booking.metric"].action_view_metrics()
+        records = self.env["resource.booking.metric"].search(action["domain"])
+        self.assertEqual(len(records), len(snapshot))
+        self.assertTrue(records.filtered(lambda one: one.calls and one.average_ms))
+        # ... or dumped
+        self.assertEqual(len(self.env["resource.booking.metric"]._dump()), len(records))
+        # Reset them
+        self.env["resource.booking.metric"].action_reset_metrics()
+        self.assertFalse(metrics.snapshot())
+
+    def test_metrics_callbacks(self):
+        """Metric callbacks can't alter measured methods."""
+
+        def _fail(*args):
+            raise ZeroDivisionError()
+
+        @metrics.measured(_fail, _fail)
+        def _method(records, error=None):
+            if error:
+                raise error
+            return "result"
+
+        metrics.reset()
+        self.assertEqual(_method(self.rbt), "result")
+        with self.assertRaises(KeyError):
+            _method(self.rbt, KeyError())
+        self.assertEqual(
+            metrics.snapshot()[_method.__qualname__, ""]["calls"],
+            2,
+        )
+        # Nothing is collected, not even subjects, when disabled
+        subject = Mock(return_value="subject")
+        metrics.reset()
+        metrics.set_enabled(False)
+        try:
+            self.assertEqual(metrics.measured(subject)(_method)(self.rbt), "result")
+        finally:
+            metrics.set_enabled(True)
+        subject.assert_not_called()
+        self.assertFalse(metrics.snapshot())
+
+    def test_busy_intervals_refresh_only_changes(self):
+        """Refreshing a recurrent series only touches changed rows."""
+        ce_f = Form(self.env["calendar.event"])
+        ce_f.name = "weekly meeting"
+        for user in self.users[:2]:
+            ce_f.partner_ids.add(user.partner_id)
+        ce_f.start = datetime(2021, 3, 1, 8)
+        ce_f.duration = 1
+        ce_f.recurrency = True
+        ce_f.interval = 1
+        ce_f.rrule_type = "weekly"
+        ce_f.end_type = "count"
+        ce_f.count = 10
+        ce_f.mo = True
+        event = ce_f.save()
+        events = event.recurrence_id.calendar_event_ids
+        self.assertEqual(len(events), 10)
+        BusyInterval = self.env["resource.busy.interval"]
+        rows = BusyInterval.search([("event_id", "in", events.ids)])
+        self.assertEqual(len(rows), 20)
+        # Nothing changed, nothing to do
+        self.assertFalse(BusyInterval._refresh(events))
+        # Uninvite one user from the whole series
+        events.write({"partner_ids": [(3, self.users[1].partner_id.id)]})
+        new_rows = BusyInterval.search([("event_id", "in", events.ids)])
+        self.assertEqual(new_rows.mapped("resource_id"), self.r_users[0])
+        self.assertLess(new_rows, rows)
+
+    def test_booking_lines(self):
+        """Booked resources are tracked, and the database forbids overlaps."""
+        Line = self.env["resource.booking.line"]
+        rb1, rb2 = self.env["resource.booking"].create(
+            [
+                {
+                    "partner_id": self.partner.id,
+                    "start": start,
+                    "type_id": self.rbt.id,
+                    "combination_id": self.rbcs[0].id,
+                    "combination_auto_assign": False,
+                }
+                for start in ("2021-03-01 08:00:00", "2021-03-01 09:00:00")
+            ]
+        )
+        lines = Line.search([("booking_id", "=", rb1.id)])
+        self.assertEqual(lines.mapped("resource_id"), self.rbcs[0].resource_ids)
+        self.assertEqual(set(lines.mapped("start")), {datetime(2021, 3, 1, 8)})
+        # Rescheduling updates lines
+        rb1.meeting_id.write(
+            {"start": datetime(2021, 3, 1, 10), "stop": datetime(2021, 3, 1, 10, 30)}
+        )
+        lines = Line.search([("booking_id", "=", rb1.id)])
+        self.assertEqual(set(lines.mapped("start")), {datetime(2021, 3, 1, 10)})
+        # Colliding with other bookings is forbidden
+        with self.assertRaises(ValidationError):
+            rb2.meeting_id.write(
+                {"start": datetime(2021, 3, 1, 10), "stop": datetime(2021, 3, 1, 11)}
+            )
+        if Line._is_overlap_forbidden():
+            with self.assertRaises(IntegrityError), mute_logger("odoo.sql_db"):
+                with self.env.cr.savepoint():
+                    Line.create(
+                        {
+                            "booking_id": rb2.id,
+                            "meeting_id": rb2.meeting_id.id,
+                            "resource_id": self.rbcs[0].resource_ids[0].id,
+                            "start": datetime(2021, 3, 1, 10, 15),
+                            "stop": datetime(2021, 3, 1, 10, 45),
+                        }
+                    )
+        # Canceled bookings free their resources
+        rb1.action_cancel()
+        self.assertFalse(Line.search([("booking_id", "=", rb1.id)]))
+
+    def test_type_change_refreshes_busy_resources(self):
+        """Changing the type can reassign the combination without touching
+        the meeting, but booked resources follow it."""
+        rbc_mon, rbc_montue = self.env["resource.booking.combination"].create(
+            [
+                {"resource_ids": [(6, 0, self.r_materials[0].ids)]},
+                {"resource_ids": [(6, 0, self.r_materials[2].ids)]},
+            ]
+        )
+        rbt_mon, rbt_montue = self.env["resource.booking.type"].create(
+            [
+                {
+                    "name": "Material %s" % rbc.name,
+                    "combination_rel_ids": [(0, 0, {"combination_id": rbc.id})],
+                    "resource_calendar_id": self.r_calendars[2].id,
+                }
+                for rbc in (rbc_mon, rbc_montue)
+            ]
+        )
+        booking = self.env["resource.booking"].create(
+            {
+                "partner_id": self.partner.id,
+                "start": "2021-03-01 08:00:00",
+                "type_id": rbt_mon.id,
+            }
+        )
+        self.assertEqual(booking.combination_id, rbc_mon)
+        meeting = booking.meeting_id
+        Busy = self.env["resource.busy.interval"]
+        Line = self.env["resource.booking.line"]
+        self.assertEqual(
+            Busy.search([("event_id", "=", meeting.id)]).resource_id,
+            self.r_materials[0],
+        )
+        booking.type_id = rbt_montue
+        self.assertEqual(booking.combination_id, rbc_montue)
+        self.assertEqual(booking.meeting_id, meeting)
+        self.assertEqual(
+            Busy.search([("event_id", "=", meeting.id)]).resource_id,
+            self.r_materials[2],
+        )
+        self.assertEqual(
+            Line.search([("booking_id", "=", booking.id)]).resource_id,
+            self.r_materials[2],
+        )
+        # The old resource is free again, and the new one is busy
+        other = self.env["resource.booking"].create(
+            {
+                "partner_id": self.partner.id,
+                "start": "2021-03-01 08:00:00",
+                "type_id": rbt_mon.id,
+            }
+        )
+        self.assertEqual(other.combination_id, rbc_mon)
+        with self.assertRaises(ValidationError), self.env.cr.savepoint():
+            other.write(
+                {"combination_auto_assign": False, "combination_id": rbc_montue.id}
+            )
+
+    def test_least_used_assignment(self):
+        """Least used combinations are assigned first, counting their loads."""
+        self.rbt.combination_assignment = "least_used"
+        bookings = self.env["resource.booking"]
+        for hour in (8, 10, 12):
+            bookings |= self.env["resource.booking"].create(
+                {
+                    "partner_id": self.partner.id,
+                    "start": datetime(2021, 3, 1, hour),
+                    "type_id": self.rbt.id,
+                }
+            )
+        # Only combinations 0 and 2 are available on Mondays; ties by sequence
+        self.assertEqual(
+            bookings.mapped("combination_id").ids,
+            [self.rbcs[0].id, self.rbcs[2].id, self.rbcs[0].id],
+        )
+        loads = self.rbcs._get_booking_loads(date(2021, 3, 1))
+        self.assertEqual(
+            loads,
+            {
+                self.rbcs[0].id: 2,
+                self.rbcs[1].id: 0,
+                self.rbcs[2].id: 1,
+                self.rbcs[3].id: 0,
+            },
+        )
+        # Loads only count bookings around the given day
+        self.assertEqual(
+            self.rbcs[0]._get_booking_loads(date(2021, 4, 1)), {self.rbcs[0].id: 0}
+        )
+        # Moving and canceling bookings updates loads
+        bookings[1].meeting_id.write(
+            {"start": datetime(2021, 3, 22, 10), "stop": datetime(2021, 3, 22, 10, 30)}
+        )
+        bookings[0].action_cancel()
+        loads = self.rbcs._get_booking_loads(date(2021, 3, 1))
+        self.assertEqual(loads[self.rbcs[0].id], 1)
+        self.assertEqual(loads[self.rbcs[2].id], 0)
+        loads = self.rbcs._get_booking_loads(date(2021, 3, 22))
+        self.assertEqual(loads[self.rbcs[2].id], 1)
+        # Bookings that already happened are still counted
+        with freeze_time("2021-03-10 09:00:00"):
+            loads = self.rbcs._get_booking_loads(date(2021, 3, 1))
+        self.assertEqual(loads[self.rbcs[0].id], 1)
+        self.assertEqual(
+            self.rbt._get_combinations_priorized(date(2021, 3, 1)),
+            self.rbcs[1] + self.rbcs[2] + self.rbcs[3] + self.rbcs[0],
+        )
+
+    def test_least_used_loads_counters(self):
+        """Combination load counters follow bookings, whatever removes them."""
+        Load = self.env["resource.booking.combination.load"]
+        Load._recount()
+        bookings = self.env["resource.booking"].create(
+            [
+                {
+                    "combination_auto_assign": False,
+                    "combination_id": self.rbcs[0].id,
+                    "partner_id": self.partner.id,
+                    "start": datetime(2021, 3, 1, hour),
+                    "type_id": self.rbt.id,
+                }
+                for hour in (8, 10, 12, 14)
+            ]
+        )
+        day = date(2021, 3, 1)
+
+        def _load():
+            return self.rbcs[0]._get_booking_loads(day)[self.rbcs[0].id]
+
+        self.assertEqual(_load(), 4)
+        # Writing unrelated fields doesn't append deltas
+        rows = Load.search_count([])
+        bookings.write({"description": "Changed"})
+        bookings[0].meeting_id.write(
+            {"start": datetime(2021, 3, 1, 8, 30), "stop": datetime(2021, 3, 1, 9)}
+        )
+        self.assertEqual(Load.search_count([]), rows)
+        # Reassigned, archived, unscheduled and unlinked bookings are discounted
+        bookings[0].combination_id = self.rbcs[2]
+        bookings[1].active = False
+        bookings[2].meeting_id.unlink()
+        bookings[3].unlink()
+        self.assertEqual(_load(), 0)
+        self.assertEqual(self.rbcs[2]._get_booking_loads(day)[self.rbcs[2].id], 1)
+        # Restoring them counts them again
+        bookings[1].active = True
+        self.assertEqual(_load(), 1)
+        # Recounting compacts deltas without changing loads
+        Load._gc_deltas()
+        self.assertEqual(_load(), 1)
+        self.assertEqual(
+            Load.search([("combination_id", "in", self.rbcs[:3].ids)]).mapped(
+                "booking_count"
+            ),
+            [1, 1],
+        )
+        # Removing a combination discards its counters
+        self.rbcs[2].unlink()
+        self.assertFalse(Load.search([("combination_id", "=", self.rbcs[2].id)]))
+
+    def test_create_bulk(self):
+        """Bookings can be created in batches and validated together."""
+        vals_list = [
+            {
+                "partner_id": self.partner.id,
+                "start": start,
+                "type_id": self.rbt.id,
+                "combination_id": rbc.id,
+                "combination_auto_assign": False,
+            }
+            for start, rbc in (
+                ("2021-03-01 08:00:00", self.rbcs[0]),
+                ("2021-03-01 09:00:00", self.rbcs[0]),
+                ("2021-03-02 08:00:00", self.rbcs[1]),
+            )
+        ]
+        bookings = self.env["resource.booking"].create_bulk(vals_list, batch_size=2)
+        self.assertEqual(len(bookings), 3)
+        self.assertEqual(bookings.mapped("state"), ["scheduled"] * 3)
+        self.assertEqual(len(bookings.mapped("meeting_id")), 3)
+        # Resources of hand-picked combinations are autoconfirmed
+        for booking in bookings:
+            resource_partners = booking.combination_id.resource_ids.user_id.partner_id
+            attendees = booking.meeting_id.attendee_ids
+            self.assertEqual(
+                attendees.filtered(lambda one: one.state == "accepted").partner_id,
+                resource_partners,
+            )
+        # Collisions are still detected
+        with self.assertRaises(ValidationError):
+            self.env["resource.booking"].create_bulk(vals_list[:1])
+
+    def test_sync_meeting_only_changes(self):
+        """Only changed values are written in meetings."""
+        bookings = self.env["resource.booking"].create(
+            [
+                {
+                    "partner_id": self.partner.id,
+                    "start": start,
+                    "type_id": self.rbt.id,
+                }
+                for start in ("2021-03-01 08:00:00", "2021-03-01 09:00:00")
+            ]
+        )
+        CalendarEvent = type(self.env["calendar.event"])
+        with patch.object(
+            CalendarEvent, "write", autospec=True, side_effect=CalendarEvent.write
+        ) as write:
+            bookings.write({"description": "<p>Some notes</p>"})
+            write.assert_not_called()
+            bookings.write({"location": "Office 3"})
+        # Both meetings changed the same way, in a single write
+        write.assert_called_once()
+        self.assertEqual(write.call_args[0][0], bookings.mapped("meeting_id"))
+        self.assertEqual(write.call_args[0][1], {"location": "Office 3"})
+        self.assertEqual(bookings.mapped("meeting_id.location"), ["Office 3"] * 2)
+
+    def test_deferred_notifications(self):
+        """Notifications can be sent in order after the request."""
+        self.env = self.env(context=dict(self.env.context, tracking_disable=False))
+        self.env["ir.config_parameter"].set_param(
+            "resource_booking.deferred_notifications", "1"
+        )
+        Notification = self.env["resource.booking.notification"]
+        # Enable auto-subscription messaging
+        with patch.object(self.env.registry, "ready", True):
+            rb = self.env["resource.booking"].create(
+                {
+                    "partner_id": self.partner.id,
+                    "start": "2021-03-01 08:00:00",
+                    "type_id": self.rbt.id,
+                    "combination_id": self.rbcs[0].id,
+                    "combination_auto_assign": False,
+                }
+            )
+            rb.start = datetime(2021, 3, 1, 10)
+        notifications = Notification.search([("booking_id", "=", rb.id)])
+        self.assertEqual(
+            notifications.mapped("template"),
+            [
+                "resource_booking.message_combination_assigned",
+                "calendar.calendar_template_meeting_invitation",
+                "calendar.calendar_template_meeting_changedate",
+            ],
+        )
+        self.assertEqual(notifications[0].partner_ids, self.users[0].partner_id)
+        # Failures are retried, and block next notifications of the booking
+        with patch.object(
+            type(Notification), "_send", autospec=True, side_effect=Exception
+        ) as send:
+            with freeze_time("2021-02-26 10:00:00"):
+                Notification._cron_send()
+            send.assert_called_once()
+            self.assertEqual(notifications.mapped("attempts"), [1, 0, 0])
+            self.assertEqual(notifications.mapped("state"), ["pending"] * 3)
+            self.assertEqual(
+                notifications[0].next_attempt, datetime(2021, 2, 26, 10, 5)
+            )
+            # Retries wait longer after each failure
+            with freeze_time("2021-02-26 10:04:00"):
+                Notification._cron_send()
+            send.assert_called_once()
+            with freeze_time("2021-02-26 10:05:00"):
+                Notification._cron_send()
+            self.assertEqual(send.call_count, 2)
+        self.assertEqual(notifications.mapped("attempts"), [2, 0, 0])
+        self.assertEqual(notifications[0].next_attempt, datetime(2021, 2, 26, 10, 15))
+        with patch.object(
+            type(self.env["calendar.attendee"]),
+            "_send_mail_to_attendees",
+            autospec=True,
+        ) as send_mail:
+            with freeze_time("2021-02-26 10:10:00"):
+                Notification._cron_send()
+            send_mail.assert_not_called()
+            with freeze_time("2021-02-26 10:15:00"):
+                Notification._cron_send()
+        self.assertEqual(notifications.mapped("state"), ["done"] * 3)
+        self.assertEqual(
+            [call[0][1] for call in send_mail.call_args_list],
+            notifications[1:].mapped("template"),
+        )
+
+    def test_schedule(self):
+        """Bookings can be scheduled in one pass, or left untouched."""
+        self.rbt.combination_assignment = "sorted"
+        rb1, rb2 = self.env["resource.booking"].create(
+            [
+                {"partner_id": self.partner.id, "type_id": self.rbt.id},
+                {
+                    "partner_id": self.partner.id,
+                    "type_id": self.rbt.id,
+                    "combination_auto_assign": False,
+                    "combination_id": self.rbcs[0].id,
+                },
+            ]
+        )
+        rb1._schedule(datetime(2021, 3, 1, 10))
+        self.assertEqual(rb1.state, "scheduled")
+        self.assertEqual(rb1.combination_id, self.rbcs[0])
+        self.assertEqual(rb1.meeting_id.start, datetime(2021, 3, 1, 10))
+        # Same slot with the same resources is not available anymore
+        with self.assertRaises(ValidationError):
+            rb2._schedule(datetime(2021, 3, 1, 10))
+        self.assertEqual(rb2.state, "pending")
+        self.assertFalse(rb2.start)
+        self.assertFalse(rb2.meeting_id)
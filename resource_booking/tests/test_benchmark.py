@@ -0,0 +1,135 @@
+# Copyright 2026 Tecnativa
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+"""Performance benchmarks for booking availability and scheduling.
+
+They are not run by default. Run them with the `resource_booking_benchmark`
+test tag, and tune data volume with these environment variables:
+
+- `RESOURCE_BOOKING_BENCHMARK_RESOURCES` (default 40)
+- `RESOURCE_BOOKING_BENCHMARK_COMBINATIONS` (default 20)
+- `RESOURCE_BOOKING_BENCHMARK_TYPES` (default 5)
+- `RESOURCE_BOOKING_BENCHMARK_EVENTS` (default 200)
+- `RESOURCE_BOOKING_BENCHMARK_BOOKINGS` (default 100)
+- `RESOURCE_BOOKING_BENCHMARK_REPORT`: path where to write the JSON report.
+  If missing, the report is logged.
+"""
+
+import json
+import logging
+import os
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from time import perf_counter
+
+from freezegun import freeze_time
+from pytz import utc
+
+from odoo.tests.common import HttpCase, tagged
+
+from .common import create_benchmark_data
+
+_logger = logging.getLogger(__name__)
+
+
+def _env_int(name, default):
+    return int(os.environ.get("RESOURCE_BOOKING_BENCHMARK_%s" % name, default))
+
+
+@tagged("-standard", "resource_booking_benchmark")
+@freeze_time("2021-02-26 09:00:00", tick=True)
+class BenchmarkCase(HttpCase):
+    def setUp(self):
+        super().setUp()
+        self.params = {
+            "resources": _env_int("RESOURCES", 40),
+            "combinations": _env_int("COMBINATIONS", 20),
+            "types": _env_int("TYPES", 5),
+            "events": _env_int("EVENTS", 200),
+            "bookings": _env_int("BOOKINGS", 100),
+        }
+        self.results = {}
+        with self.measure("data_generation"):
+            create_benchmark_data(
+                self,
+                resources=self.params["resources"],
+                combinations=self.params["combinations"],
+                types=self.params["types"],
+                events=self.params["events"],
+            )
+
+    @contextmanager
+    def measure(self, name, calls=1):
+        """Record wall time and SQL queries spent in the block."""
+        queries = self.cr.sql_log_count
+        start = perf_counter()
+        yield
+        self.results[name] = {
+            "calls": calls,
+            "queries": self.cr.sql_log_count - queries,
+            "seconds": round(perf_counter() - start, 6),
+        }
+
+    def report(self):
+        """Output the machine-readable report."""
+        report = json.dumps(
+            {"params": self.params, "results": self.results}, indent=2, sort_keys=True
+        )
+        path = os.environ.get("RESOURCE_BOOKING_BENCHMARK_REPORT")
+        if path:
+            with open(path, "w") as report_file:
+                report_file.write(report)
+        else:
+            _logger.info("Resource booking benchmark report:\n%s", report)
+
+    def test_benchmark(self):
+        Booking = self.env["resource.booking"]
+        month_start = utc.localize(datetime(2021, 3, 1))
+        month_end = utc.localize(datetime(2021, 4, 1))
+        # Bookings scheduled on mornings, one per slot, to avoid conflicts
+        bookings_vals = [
+            {
+                "partner_id": self.bm_partner.id,
+                "type_id": self.bm_rbts[num % len(self.bm_rbts)].id,
+                "start": datetime(2021, 3, 1, 8)
+                + timedelta(
+                    days=num // 8 // 5 * 7 + num // 8 % 5, minutes=30 * (num % 8)
+                ),
+            }
+            for num in range(self.params["bookings"])
+        ]
+        # Compare plain and bulk creation with half of the bookings each
+        half = len(bookings_vals) // 2
+        with self.measure("booking_create", half):
+            bookings = Booking.create(bookings_vals[:half])
+        with self.measure("bulk_booking_create", len(bookings_vals) - half):
+            bookings |= Booking.create_bulk(bookings_vals[half:])
+        with self.measure("check_scheduling", len(bookings)):
+            bookings._check_scheduling()
+        sample = bookings[:50]
+        with self.measure("get_best_combination", len(sample)):
+            for booking in sample:
+                booking._get_best_combination()
+        pending = Booking.create(
+            [
+                {"partner_id": self.bm_partner.id, "type_id": rbt.id}
+                for rbt in self.bm_rbts
+            ]
+        )
+        self.env["resource.booking.slot.cache"]._invalidate_all()
+        with self.measure("get_available_slots_cold", len(pending)):
+            for booking in pending:
+                booking._get_available_slots(month_start, month_end)
+        with self.measure("get_available_slots_warm", len(pending)):
+            for booking in pending:
+                booking._get_available_slots(month_start, month_end)
+        with self.measure("calendar_event_busy_intervals", len(self.bm_resources)):
+            for resource in self.bm_resources:
+                self.bm_calendar._calendar_event_busy_intervals(
+                    month_start, month_end, resource, -1
+                )
+        self.env["resource.booking.slot.cache"]._invalidate_all()
+        url = pending[0].get_portal_url(suffix="/schedule/2021/03")
+        with self.measure("portal_schedule_render"):
+            response = self.url_open(url, timeout=600)
+        self.assertEqual(response.status_code, 200)
+        self.report()
@@ -1,6 +1,8 @@
 # Copyright 2021 Tecnativa - Jairo Llopis
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
+import json
+import re
 from datetime import datetime
 
 from freezegun import freeze_time
@@ -40,6 +42,16 @@ class PortalCase(HttpCase):
         response = self.url_open(url, data, timeout=timeout)
         return fromstring(response.content)
 
+    def _break_calendar_tz(self):
+        """Give the booking type calendar a timezone that doesn't exist."""
+        calendar = self.rbt.resource_calendar_id
+        calendar.flush(["tz"])
+        self.env.cr.execute(
+            "UPDATE resource_calendar SET tz = 'Mars/Olympus' WHERE id = %s",
+            (calendar.id,),
+        )
+        calendar.invalidate_cache(["tz"])
+
     def test_portal_no_bookings(self):
         self.authenticate("ptl", "ptl")
         page = fromstring(self.url_open("/my").content)
@@ -64,6 +76,54 @@ class PortalCase(HttpCase):
         page = self._url_xml(link.get("href"))
         self.assertTrue(page.cssselect('.badge:contains("Pending")'))
 
+    def test_portal_list_keyset_pages(self):
+        """Bookings list is paginated by seeking from the page limits."""
+        bookings = self.env["resource.booking"].create(
+            [
+                {"partner_id": self.user_portal.partner_id.id, "type_id": self.rbt.id}
+                for _num in range(25)
+            ]
+        )
+        # Pending bookings are listed first, newest first
+        expected = bookings.sorted("id", reverse=True).ids
+
+        def listed(page):
+            return [
+                int(re.match(r"/my/bookings/(\d+)\?", link.get("href")).group(1))
+                for link in page.cssselect(".o_portal_my_doc_table tbody a")
+            ]
+
+        self.authenticate("ptl", "ptl")
+        page = self._url_xml("/my")
+        link = page.cssselect('.o_portal_docs a:contains("Bookings")')[0]
+        self.assertEqual(link.cssselect(".badge")[0].text.strip(), "25")
+        # First page
+        page = self._url_xml(link.get("href"))
+        self.assertEqual(listed(page), expected[:20])
+        prev_link, next_link = page.cssselect(".o_booking_pager a")
+        self.assertIsNone(prev_link.get("href"))
+        self.assertEqual(next_link.get("href"), "/my/bookings?after=%d" % expected[19])
+        # Last page
+        page = self._url_xml(next_link.get("href"))
+        self.assertEqual(listed(page), expected[20:])
+        prev_link, next_link = page.cssselect(".o_booking_pager a")
+        self.assertIsNone(next_link.get("href"))
+        self.assertEqual(prev_link.get("href"), "/my/bookings?before=%d" % expected[20])
+        # Back to the first page
+        page = self._url_xml(prev_link.get("href"))
+        self.assertEqual(listed(page), expected[:20])
+        prev_link, next_link = page.cssselect(".o_booking_pager a")
+        self.assertIsNone(prev_link.get("href"))
+        # Numbered pages don't exist
+        self.assertEqual(self.url_open("/my/bookings/page/2").status_code, 404)
+        # Recent count is reused
+        self.env["resource.booking"].create(
+            {"partner_id": self.user_portal.partner_id.id, "type_id": self.rbt.id}
+        )
+        page = self._url_xml("/my")
+        link = page.cssselect('.o_portal_docs a:contains("Bookings")')[0]
+        self.assertEqual(link.cssselect(".badge")[0].text.strip(), "25")
+
     def test_portal_scheduling_conflict(self):
         """Produce a scheduling conflict and see how UI behaves.
 
@@ -233,7 +293,15 @@ class PortalCase(HttpCase):
         self.assertFalse(portal_page.cssselect(selector_10am))
         self.assertTrue(portal_page.cssselect(selector_1030am))
         slot = datetime(2021, 3, 1, 10, 30).timestamp()
-        self.assertTrue(portal_page.cssselect("#dropdown-trigger-2021-03-08"))
+        # Next weeks are loaded afterwards by the browser
+        self.assertFalse(portal_page.cssselect("#dropdown-trigger-2021-03-08"))
+        self.assertTrue(
+            portal_page.cssselect("tr[data-lazy-start] td[data-date='2021-03-08']")
+        )
+        self.assertTrue(portal_page.cssselect("tr[data-lazy-end='2021-04-01']"))
+        self.assertFalse(
+            portal_page.cssselect("tr[data-lazy-start] td[data-date='2021-03-01']")
+        )
         form = portal_page.cssselect("form#modal-confirm-%d" % slot)[0]
         portal_url = form.get("action")
         data = {
@@ -264,3 +332,112 @@ class PortalCase(HttpCase):
         portal_url = link.get("href")
         portal_page = self._url_xml(portal_url)
         self.assertTrue(portal_page.cssselect(".oe_login_form"))
+
+    def test_portal_schedule_slots_json(self):
+        """Slots can be fetched on demand, grouped by day."""
+        self.rbt.combination_rel_ids[1:].unlink()
+        booking = self.env["resource.booking"].create(
+            {"partner_id": self.partner.id, "type_id": self.rbt.id, "duration": 4}
+        )
+        url = booking.get_portal_url(suffix="/schedule/slots")
+        url, query = url.split("?")
+        access_token = dict(part.split("=") for part in query.split("&"))[
+            "access_token"
+        ]
+
+        def _slots(start, end):
+            response = self.url_open(
+                url,
+                data=json.dumps(
+                    {
+                        "params": {
+                            "access_token": access_token,
+                            "start": start,
+                            "end": end,
+                        }
+                    }
+                ),
+                headers={"Content-Type": "application/json"},
+            )
+            return response.json()
+
+        result = _slots("2021-03-01", "2021-03-08")["result"]
+        self.assertEqual(result["tz"], "UTC")
+        self.assertEqual(
+            result["slots"],
+            {
+                "2021-03-01": [
+                    datetime(2021, 3, 1, hour, minute).timestamp()
+                    for hour in range(8, 14)
+                    for minute in (0, 30)
+                    if (hour, minute) != (13, 30)
+                ]
+            },
+        )
+        # Too long periods are rejected
+        self.assertIn("error", _slots("2021-03-01", "2021-06-01"))
+        # Malformed dates are rejected with a user error
+        for start, end in (("2021-03-01", "next week"), (None, "2021-03-08")):
+            self.assertEqual(
+                _slots(start, end)["error"]["data"]["name"],
+                "odoo.exceptions.ValidationError",
+            )
+        # Unknown timezones are rejected with a user error
+        self._break_calendar_tz()
+        self.assertEqual(
+            _slots("2021-03-01", "2021-03-08")["error"]["data"]["name"],
+            "odoo.exceptions.ValidationError",
+        )
+
+    def test_portal_schedule_next_json(self):
+        """Next available slots can be fetched, no matter how far."""
+        booking = self.env["resource.booking"].create(
+            {"partner_id": self.partner.id, "type_id": self.rbt.id}
+        )
+        url, query = booking.get_portal_url(suffix="/schedule/next").split("?")
+        access_token = dict(part.split("=") for part in query.split("&"))[
+            "access_token"
+        ]
+
+        def _next(start, count):
+            response = self.url_open(
+                url,
+                data=json.dumps(
+                    {
+                        "params": {
+                            "access_token": access_token,
+                            "start": start,
+                            "count": count,
+                        }
+                    }
+                ),
+                headers={"Content-Type": "application/json"},
+            )
+            return response.json()
+
+        self.assertEqual(
+            _next("2021-03-02T17:00:00+00:00", 2)["result"],
+            {
+                "slots": [
+                    datetime(2021, 3, 8, 8).timestamp(),
+                    datetime(2021, 3, 8, 8, 30).timestamp(),
+                ],
+                "tz": "UTC",
+            },
+        )
+        # Malformed parameters are rejected with a user error
+        for start, count in (
+            ("2021-03-02T17:00:00+00:00", "two"),
+            ("2021-03-02T17:00:00+00:00", None),
+            ("next monday", 2),
+        ):
+            self.assertEqual(
+                _next(start, count)["error"]["data"]["name"],
+                "odoo.exceptions.ValidationError",
+            )
+        # Unknown timezones are rejected with a user error
+        self._break_calendar_tz()
+        self.assertEqual(
+            _next("2021-03-02T17:00:00+00:00", 2)["error"]["data"]["name"],
+            "odoo.exceptions.ValidationError",
+        )